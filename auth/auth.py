@@ -6,11 +6,13 @@ import jwt
 from fastapi import HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jwt import PyJWTError
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from auth.password_service import verify_password, get_password_hash
+from auth.principal_cache import get_principal, cache_principal, principal_generation
 from database.model.user_model import User
+from database.routing import set_user, use_primary
 from database.operations.user_operations import get_user_by_username
 
 SECRET_KEY = os.getenv("SECRETKEY")
@@ -19,14 +21,6 @@ ACCESS_TOKEN_EXPIRE_MINUTES = 525600
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def verify_password(plain_password, hashed_password) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
-
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
     if expires_delta:
@@ -45,9 +39,16 @@ async def decode_access_token(token: str, session: AsyncSession) -> User | None:
         username: str = payload.get("sub")
         if not username:
             raise HTTPException(status_code=404, detail="user not found")
-        user = await get_user_by_username(username, session)
+        set_user(username)
+        principal = get_principal(username)
+        if principal:
+            return principal
+        generation = principal_generation()
+        # A principal is cached for AUTHCACHETTL, so it must not be filled from a replica that lags a role change.
+        with use_primary():
+            user = await get_user_by_username(username, session)
         if not user:
             raise HTTPException(status_code=404, detail="user not found")
-        return user
+        return cache_principal(user, generation)
     except PyJWTError as err:
         raise HTTPException(status_code=403, detail=f'{str(err)}')
@@ -0,0 +1,56 @@
+import asyncio
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from utils.metrics import Counter, Gauge, Histogram
+
+# bcrypt releases the GIL while hashing, so a thread pool spreads the work over cores without pickling overhead.
+PASSWORD_WORKERS = int(os.getenv("PASSWORDWORKERS", str(os.cpu_count() or 1)))
+# Calls allowed to wait for a worker before new ones are turned away with a 503.
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORDQUEUESIZE", "64"))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="password")
+_pending = 0
+
+_duration = Histogram("password_hash_duration_seconds", "Time spent hashing or verifying a password in a worker.",
+                      buckets=(.01, .025, .05, .1, .25, .5, 1, 2.5))
+_latency = Histogram("password_hash_latency_seconds", "Time from request to result, including the wait for a worker.",
+                     buckets=(.01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10))
+_rejected = Counter("password_hash_rejected_total", "Password operations rejected because the queue was full.")
+Gauge("password_hash_pending", "Password operations running or waiting for a worker.", lambda: _pending)
+
+
+def _timed(operation: str, function, *args):
+    started = time.perf_counter()
+    try:
+        return function(*args)
+    finally:
+        _duration.observe(time.perf_counter() - started, operation=operation)
+
+
+async def _run(operation: str, function, *args):
+    global _pending
+    if _pending >= PASSWORD_WORKERS + PASSWORD_QUEUE_SIZE:
+        _rejected.inc(operation=operation)
+        raise HTTPException(status_code=503, detail="Server is busy, try again later")
+    _pending += 1
+    started = time.perf_counter()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(_executor, _timed, operation, function, *args)
+    finally:
+        _pending -= 1
+        _latency.observe(time.perf_counter() - started, operation=operation)
+
+
+async def verify_password(plain_password, hashed_password) -> bool:
+    return await _run("verify", pwd_context.verify, plain_password, hashed_password)
+
+
+async def get_password_hash(password: str) -> str:
+    return await _run("hash", pwd_context.hash, password)
@@ -0,0 +1,55 @@
+import os
+
+from database.model.user_model import User
+from utils.lru_cache import LRUCache
+from utils.metrics import Counter, Gauge
+
+AUTH_CACHE_TTL = float(os.getenv("AUTHCACHETTL", "60"))
+AUTH_CACHE_SIZE = int(os.getenv("AUTHCACHESIZE", "10000"))
+
+_principals = LRUCache(AUTH_CACHE_SIZE, AUTH_CACHE_TTL)
+_generation = 0
+
+Counter("auth_cache_hits_total", "Authenticated principal cache hits.", lambda: _principals.hits)
+Counter("auth_cache_misses_total", "Authenticated principal cache misses.", lambda: _principals.misses)
+Gauge("auth_cache_entries", "Authenticated principals currently cached.", lambda: len(_principals))
+
+
+def get_principal(username: str) -> User | None:
+    return _principals.get(username)
+
+
+def principal_generation() -> int:
+    return _generation
+
+
+def cache_principal(user: User, generation: int) -> User:
+    # Keep a transient copy so the cached principal never depends on the session that loaded it.
+    principal = User(
+        id=user.id,
+        display_name=user.display_name,
+        username=user.username,
+        about=user.about,
+        role=user.role,
+        password=user.password,
+    )
+    # A lookup that raced with an invalidation must not put the stale row back.
+    if generation == _generation:
+        _principals.set(user.username, principal)
+    return principal
+
+
+def invalidate_principal(user_id: int):
+    global _generation
+    _generation += 1
+    _principals.pop_where(lambda username, principal: principal.id == user_id)
+
+
+def clear_principals():
+    global _generation
+    _generation += 1
+    _principals.clear()
+
+
+def principal_cache_stats() -> dict:
+    return _principals.stats()
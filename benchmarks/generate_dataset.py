@@ -0,0 +1,224 @@
+import argparse
+import asyncio
+import os
+import random
+import time
+from itertools import accumulate, islice
+
+parser = argparse.ArgumentParser(
+    description="Fill the database with a deterministic synthetic dataset for scale testing: skewed quiz popularity, "
+                "prolific authors, crowded categories and configurable question/answer fan-out.")
+parser.add_argument("--url", default=os.getenv("DATABASEURL", "sqlite+aiosqlite:///dataset.db"))
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--users", type=int, default=100_000)
+parser.add_argument("--categories", type=int, default=200)
+parser.add_argument("--quizzes", type=int, default=250_000)
+parser.add_argument("--questions", default="5-15", help="questions per quiz, N or MIN-MAX")
+parser.add_argument("--answers", default="4", help="answers per question, N or MIN-MAX")
+parser.add_argument("--taken", type=int, default=2_000_000, help="taken quiz rows")
+parser.add_argument("--approved", type=float, default=0.9, help="fraction of approved quizzes and categories")
+parser.add_argument("--skew", type=float, default=1.1,
+                    help="Zipf exponent for quiz popularity, authors and category sizes; 0 spreads evenly")
+parser.add_argument("--password", default="Password@123", help="password every generated user logs in with")
+parser.add_argument("--batch", type=int, default=50_000, help="rows per COPY or executemany batch")
+parser.add_argument("--reset", action="store_true", help="empty the tables first instead of appending")
+args = parser.parse_args()
+
+os.environ["DATABASEURL"] = args.url
+os.environ.setdefault("DBPROFILE", "benchmark")
+
+from sqlalchemy import text, func, select, delete
+
+from auth.password_service import get_password_hash
+from database.db import Base, engine
+from database.indexes import install_indexes
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+from database.search import install_search_indexes
+
+TOPICS = ["physics", "chemistry", "biology", "history", "geography", "algebra", "geometry", "music", "painting",
+          "football", "tennis", "coding", "databases", "movies", "literature", "astronomy", "economics", "cooking"]
+LEVELS = ["basic", "intermediate", "advanced", "tricky", "quick", "weekly", "classic", "modern"]
+WORDS = ["which", "what", "when", "where", "first", "largest", "famous", "known", "called", "used", "found", "made"]
+
+MODELS = (User, Category, Quiz, Question, Answer, TakenQuiz)
+
+
+def fan_out(spec: str) -> tuple[int, int]:
+    low, _, high = spec.partition("-")
+    return int(low), int(high or low)
+
+
+# Ids ranked by a shuffled Zipf law: a handful take most of the draws, the long tail is rarely picked.
+class Popularity:
+    def __init__(self, ids: list[int], rng: random.Random):
+        self.rng = rng
+        self.ids = ids[:]
+        rng.shuffle(self.ids)
+        self.weights = [1 / rank ** args.skew for rank in range(1, len(ids) + 1)]
+        self.cumulative = list(accumulate(self.weights))
+
+    def share(self, position: int) -> float:
+        return self.weights[position] / self.cumulative[-1]
+
+    def pick(self, k: int) -> list[int]:
+        return self.rng.choices(self.ids, cum_weights=self.cumulative, k=k)
+
+
+class Plan:
+    def __init__(self, first: dict[str, int]):
+        self.first = first
+        self.password = ""
+        rng = random.Random(f"{args.seed}-plan")
+        self.user_ids = range(first["users"], first["users"] + args.users)
+        self.category_ids = range(first["categories"], first["categories"] + args.categories)
+        self.quiz_ids = range(first["quizzes"], first["quizzes"] + args.quizzes)
+        low, high = fan_out(args.questions)
+        self.question_counts = [rng.randint(low, high) for _ in self.quiz_ids]
+        self.approved = [rng.random() < args.approved for _ in self.quiz_ids]
+        self.approved_quizzes = [quiz_id for quiz_id, approved in zip(self.quiz_ids, self.approved) if approved]
+        self.authors = Popularity(list(self.user_ids), random.Random(f"{args.seed}-authors"))
+        self.crowded = Popularity(list(self.category_ids), random.Random(f"{args.seed}-categories"))
+        self.popular = Popularity(self.approved_quizzes, random.Random(f"{args.seed}-popular"))
+        self.takers = Popularity(list(self.user_ids), random.Random(f"{args.seed}-takers"))
+
+
+def users(plan: Plan):
+    rng = random.Random(f"{args.seed}-users")
+    for user_id in plan.user_ids:
+        about = f"I like {rng.choice(TOPICS)} and {rng.choice(TOPICS)} quizzes." if rng.random() < 0.3 else None
+        yield user_id, f"User {user_id}", f"user{user_id}", about, "user", plan.password
+
+
+def categories(plan: Plan):
+    rng = random.Random(f"{args.seed}-categories-rows")
+    for category_id in plan.category_ids:
+        topic = TOPICS[category_id % len(TOPICS)]
+        yield (category_id, f"{topic.title()} {category_id}", f"Quizzes about {topic} and {rng.choice(TOPICS)}",
+               rng.random() < args.approved, 0)
+
+
+def quizzes(plan: Plan):
+    rng = random.Random(f"{args.seed}-quizzes")
+    # Ratings follow popularity: a quiz is rated by roughly a third of the people expected to take it.
+    expected_rates = {quiz_id: args.taken * plan.popular.share(position) / 3
+                      for position, quiz_id in enumerate(plan.popular.ids)}
+    authors = plan.authors.pick(args.quizzes)
+    categories = plan.crowded.pick(args.quizzes)
+    for index, quiz_id in enumerate(plan.quiz_ids):
+        rate_count = int(rng.expovariate(1 / expected_rates[quiz_id])) if quiz_id in expected_rates else 0
+        total_rate = float(sum(rng.choices((1, 2, 3, 4, 5), (1, 1, 2, 4, 3), k=min(rate_count, 50))) * rate_count
+                           / min(rate_count, 50)) if rate_count else 0.0
+        topic = rng.choice(TOPICS)
+        yield (quiz_id, authors[index], total_rate, rate_count, categories[index], plan.approved[index],
+               f"{rng.choice(LEVELS).title()} {topic} quiz {quiz_id}",
+               f"A {rng.choice(LEVELS)} quiz about {topic} and {rng.choice(TOPICS)}", 0)
+
+
+def questions(plan: Plan):
+    rng = random.Random(f"{args.seed}-questions")
+    question_id = plan.first["questions"]
+    for quiz_id, count in zip(plan.quiz_ids, plan.question_counts):
+        for number in range(count):
+            yield question_id, quiz_id, f"{rng.choice(WORDS).title()} {' '.join(rng.choices(WORDS, k=4))} {rng.choice(TOPICS)}?"
+            question_id += 1
+
+
+def answers(plan: Plan):
+    rng = random.Random(f"{args.seed}-answers")
+    low, high = fan_out(args.answers)
+    question_id = plan.first["questions"]
+    answer_id = plan.first["answers"]
+    for count in plan.question_counts:
+        for _ in range(count):
+            options = rng.randint(low, high)
+            correct = rng.randrange(options)
+            for number in range(options):
+                yield answer_id, question_id, f"{rng.choice(TOPICS).title()} {rng.choice(WORDS)} {number}", number == correct
+                answer_id += 1
+            question_id += 1
+
+
+def taken_quizzes(plan: Plan):
+    if not plan.approved_quizzes:
+        return
+    rng = random.Random(f"{args.seed}-taken")
+    totals = dict(zip(plan.quiz_ids, plan.question_counts))
+    taken_id = plan.first["takenQuizzes"]
+    remaining = args.taken
+    while remaining:
+        k = min(remaining, args.batch)
+        for quiz_id, user_id in zip(plan.popular.pick(k), plan.takers.pick(k)):
+            total = totals[quiz_id]
+            yield taken_id, quiz_id, user_id, rng.randint(0, total), total
+            taken_id += 1
+        remaining -= k
+
+
+GENERATORS = {
+    "users": (users, ("id", "display_name", "username", "about", "role", "password")),
+    "categories": (categories, ("id", "name", "description", "approved", "revision")),
+    "quizzes": (quizzes, ("id", "user_id", "total_rate", "rate_count", "category_id", "approved", "title",
+                          "description", "revision")),
+    "questions": (questions, ("id", "quiz_id", "text")),
+    "answers": (answers, ("id", "question_id", "text", "isCorrect")),
+    "takenQuizzes": (taken_quizzes, ("id", "quiz_id", "user_id", "correct_answers", "total_answers")),
+}
+
+
+async def load(conn, table: str, columns: tuple[str, ...], rows) -> int:
+    # COPY on asyncpg; everywhere else one executemany per batch, which skips the ORM and RETURNING entirely.
+    driver = (await conn.get_raw_connection()).driver_connection if engine.dialect.driver == "asyncpg" else None
+    insert = Base.metadata.tables[table].insert()
+    loaded = 0
+    while batch := list(islice(rows, args.batch)):
+        if driver is not None:
+            await driver.copy_records_to_table(table, records=batch, columns=columns)
+        else:
+            await conn.execute(insert, [dict(zip(columns, row)) for row in batch])
+        loaded += len(batch)
+    return loaded
+
+
+async def main():
+    started = time.perf_counter()
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await install_indexes(conn)
+        await install_search_indexes(conn)
+        if args.reset:
+            if engine.dialect.name == "postgresql":
+                await conn.execute(text('TRUNCATE users, categories, quizzes, questions, answers, "takenQuizzes"'))
+            else:
+                for model in reversed(MODELS):
+                    await conn.execute(delete(model))
+        # Appending continues after the current highest ids, so the same seed always adds the same rows.
+        first = {model.__tablename__: (await conn.execute(select(func.coalesce(func.max(model.id), 0)))).scalar_one() + 1
+                 for model in MODELS}
+        plan = Plan(first)
+        plan.password = await get_password_hash(args.password)
+        print(f"{engine.dialect.name}: seed {args.seed}, skew {args.skew}, questions {args.questions}, "
+              f"answers {args.answers}")
+        for table, (generate, columns) in GENERATORS.items():
+            table_started = time.perf_counter()
+            loaded = await load(conn, table, columns, generate(plan))
+            elapsed = time.perf_counter() - table_started
+            print(f"{table:<14} {loaded:>12,} rows {elapsed:>8.1f}s {loaded / elapsed if elapsed else 0:>12,.0f} rows/s")
+        if engine.dialect.name == "postgresql":
+            # Rows carry explicit ids, so the serial sequences have to be moved past them.
+            for table in GENERATORS:
+                await conn.execute(text(f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), "
+                                        f"(SELECT coalesce(max(id), 0) + 1 FROM \"{table}\"), false)"))
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE"))
+        await conn.commit()
+    await engine.dispose()
+    print(f"done in {time.perf_counter() - started:.1f}s; every generated user logs in as user<ID> / {args.password}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
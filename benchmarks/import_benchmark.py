@@ -0,0 +1,123 @@
+import argparse
+import asyncio
+import json
+import os
+import time
+
+parser = argparse.ArgumentParser(description="Measure bulk quiz import throughput against row-by-row inserts.")
+parser.add_argument("--url", default="sqlite+aiosqlite:///import_benchmark.db")
+parser.add_argument("--questions", type=int, default=10_000)
+parser.add_argument("--answers", type=int, default=4, help="answers per question")
+parser.add_argument("--repeat", type=int, default=3)
+args = parser.parse_args()
+
+os.environ["DATABASEURL"] = args.url
+os.environ.setdefault("DBPROFILE", "benchmark")
+
+from sqlalchemy import insert, delete
+
+from database.db import Base, engine, sessionLocal
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+from database.operations import quiz_operations
+from database.search import install_search_indexes
+from models.requests.quiz_import_request import QuizImportRequest, QuestionImport
+from utils.ndjson import read_ndjson_lines
+from routes.quiz_routes import IMPORT_BATCH_SIZE
+
+
+async def setup() -> tuple[int, int]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await install_search_indexes(conn)
+        for model in (Answer, Question, TakenQuiz, Quiz, Category, User):
+            await conn.execute(delete(model))
+        user_id = (await conn.execute(insert(User).returning(User.id),
+                                      [{"display_name": "Bench", "username": "bench", "password": "x", "role": "user"}])).scalar_one()
+        category_id = (await conn.execute(insert(Category).returning(Category.id),
+                                          [{"name": "Bench", "description": "bench", "approved": True}])).scalar_one()
+    return user_id, category_id
+
+
+def make_document(category_id: int) -> dict:
+    return {
+        "category_id": category_id,
+        "title": "Imported bank",
+        "description": "benchmark question bank",
+        "questions": [{
+            "text": f"Question number {i}",
+            "answers": [{"text": f"Answer {i}.{j}", "isCorrect": j == 0} for j in range(args.answers)],
+        } for i in range(args.questions)],
+    }
+
+
+# What building a quiz costs without the import endpoint: one ORM add and flush per question, then its answers.
+async def row_by_row(user_id: int, document: dict):
+    async with sessionLocal() as session:
+        quiz = Quiz(user_id=user_id, category_id=document["category_id"], title=document["title"],
+                    description=document["description"])
+        session.add(quiz)
+        await session.flush()
+        for item in document["questions"]:
+            question = Question(quiz_id=quiz.id, text=item["text"])
+            session.add(question)
+            await session.flush()
+            session.add_all([Answer(question_id=question.id, **answer) for answer in item["answers"]])
+        await session.commit()
+
+
+async def json_import(user_id: int, document: dict):
+    quiz = QuizImportRequest.model_validate_json(json.dumps(document))
+
+    async def batches():
+        for start in range(0, len(quiz.questions), IMPORT_BATCH_SIZE):
+            yield quiz.questions[start:start + IMPORT_BATCH_SIZE]
+
+    await quiz_operations.import_quiz(user_id, quiz, batches(), sessionLocal())
+
+
+async def ndjson_import(user_id: int, document: dict):
+    header = {key: document[key] for key in ("category_id", "title", "description")}
+    payload = "\n".join([json.dumps(header)] + [json.dumps(question) for question in document["questions"]]).encode()
+
+    async def chunks():
+        for start in range(0, len(payload), 65536):
+            yield payload[start:start + 65536]
+
+    lines = read_ndjson_lines(chunks())
+    _, line = await anext(lines)
+    quiz = QuizImportRequest.model_validate_json(line)
+
+    async def batches():
+        batch = []
+        async for _, line in lines:
+            batch.append(QuestionImport.model_validate_json(line))
+            if len(batch) == IMPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+        yield batch
+
+    await quiz_operations.import_quiz(user_id, quiz, batches(), sessionLocal())
+
+
+async def main():
+    user_id, category_id = await setup()
+    document = make_document(category_id)
+    rows = args.questions * (1 + args.answers) + 1
+    print(f"{engine.dialect.name}: {args.questions} questions x {args.answers} answers ({rows} rows), best of {args.repeat}")
+    for label, run in (("row-by-row", row_by_row), ("json import", json_import), ("ndjson import", ndjson_import)):
+        best = float("inf")
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            await run(user_id, document)
+            best = min(best, time.perf_counter() - started)
+        print(f"{label:>14}: {best:7.2f} s  {args.questions / best:9.0f} questions/s  {rows / best:9.0f} rows/s")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
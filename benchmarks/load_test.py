@@ -0,0 +1,307 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from contextvars import ContextVar
+
+parser = argparse.ArgumentParser(
+    description="Drive a weighted mix of requests across every router against a seeded database and report throughput, "
+                "latency percentiles and SQL statements per request for each endpoint.")
+parser.add_argument("--url", default="sqlite+aiosqlite:///load_test.db")
+parser.add_argument("--concurrency", default="1,8,32", help="comma-separated concurrency levels")
+parser.add_argument("--requests", type=int, default=2000, help="requests per concurrency level")
+parser.add_argument("--users", type=int, default=50)
+parser.add_argument("--categories", type=int, default=10)
+parser.add_argument("--quizzes", type=int, default=500)
+parser.add_argument("--questions", type=int, default=10, help="questions per quiz, four answers each")
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--save", help="write the results to this JSON file as a baseline")
+parser.add_argument("--compare", help="compare against a baseline written by --save; exits 1 on a regression")
+parser.add_argument("--tolerance", type=float, default=0.2,
+                    help="allowed relative p95 growth and throughput drop before a change counts as a regression")
+parser.add_argument("--min-samples", type=int, default=30,
+                    help="endpoints with fewer requests than this in either run are not compared on latency")
+args = parser.parse_args()
+
+os.environ["DATABASEURL"] = args.url
+os.environ.setdefault("DBPROFILE", "benchmark")
+os.environ.setdefault("SECRETKEY", "load-test-secret-key-load-test-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("USERNAME", "adminUser")
+os.environ.setdefault("PASSWORD", "Admin@123")
+# Under contention every statement waiting on a lock would be logged as slow and drown the report.
+os.environ.setdefault("SLOWQUERYSECONDS", "0")
+
+import httpx
+from sqlalchemy import event, insert, delete
+
+from auth.auth import create_access_token
+from auth.password_service import get_password_hash
+from database.db import Base, engine, replica_engines
+from database.indexes import install_indexes
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+from database.pagination import encode_cursor
+from database.search import install_search_indexes
+from main import app
+
+PASSWORD = "Bench@12345"
+TOPICS = ["physics", "chemistry", "biology", "history", "geography", "algebra", "music", "painting", "football", "coding"]
+LEVELS = ["basic", "intermediate", "advanced", "tricky", "quick", "weekly"]
+
+statements: ContextVar[list[int] | None] = ContextVar("statements", default=None)
+
+
+def count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+for target in (engine, *replica_engines):
+    event.listen(target.sync_engine, "before_cursor_execute", count_statement)
+
+
+class Dataset:
+    def __init__(self):
+        self.users: list[tuple[int, str]] = []
+        self.categories: list[int] = []
+        self.approved_quizzes: list[int] = []
+        self.quizzes_by_user: dict[int, list[int]] = {}
+        self.questions_by_quiz: dict[int, list[int]] = {}
+        self.answers_by_question: dict[int, list[int]] = {}
+
+
+async def seed(rng: random.Random) -> Dataset:
+    data = Dataset()
+    password = await get_password_hash(PASSWORD)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await install_indexes(conn)
+        await install_search_indexes(conn)
+        for model in (Answer, Question, TakenQuiz, Quiz, Category, User):
+            await conn.execute(delete(model))
+        names = [f"bench{i}" for i in range(args.users)]
+        user_ids = (await conn.execute(insert(User).returning(User.id, sort_by_parameter_order=True), [
+            {"display_name": f"Bench User {i}", "username": name, "password": password, "role": "user"}
+            for i, name in enumerate(names)
+        ])).scalars().all()
+        data.users = list(zip(user_ids, names))
+        data.categories = (await conn.execute(insert(Category).returning(Category.id, sort_by_parameter_order=True), [
+            {"name": f"{TOPICS[i % len(TOPICS)].title()} {i}", "description": "seeded category", "approved": True}
+            for i in range(args.categories)
+        ])).scalars().all()
+        rows = [{"user_id": rng.choice(user_ids), "category_id": rng.choice(data.categories), "approved": rng.random() < 0.8,
+                 "title": f"{rng.choice(LEVELS).title()} {rng.choice(TOPICS)} quiz {i}",
+                 "description": f"A {rng.choice(LEVELS)} quiz about {rng.choice(TOPICS)}"} for i in range(args.quizzes)]
+        quiz_ids = (await conn.execute(insert(Quiz).returning(Quiz.id, sort_by_parameter_order=True), rows)).scalars().all()
+        for quiz_id, row in zip(quiz_ids, rows):
+            data.quizzes_by_user.setdefault(row["user_id"], []).append(quiz_id)
+            if row["approved"]:
+                data.approved_quizzes.append(quiz_id)
+        question_rows = [{"quiz_id": quiz_id, "text": f"Question {i} of quiz {quiz_id}?"}
+                         for quiz_id in quiz_ids for i in range(args.questions)]
+        question_ids = (await conn.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True),
+                                           question_rows)).scalars().all()
+        answer_rows = [{"question_id": question_id, "text": f"Answer {i}", "isCorrect": i == 0}
+                       for question_id in question_ids for i in range(4)]
+        answer_ids = (await conn.execute(insert(Answer).returning(Answer.id, sort_by_parameter_order=True),
+                                         answer_rows)).scalars().all()
+        for question_id, row in zip(question_ids, question_rows):
+            data.questions_by_quiz.setdefault(row["quiz_id"], []).append(question_id)
+        for answer_id, row in zip(answer_ids, answer_rows):
+            data.answers_by_question.setdefault(row["question_id"], []).append(answer_id)
+    return data
+
+
+class VirtualUser:
+    def __init__(self, data: Dataset, rng: random.Random, name: str):
+        self.data = data
+        self.rng = rng
+        self.name = name
+        self.sent = 0
+        self.user_id, self.username = rng.choice(data.users)
+        self.headers = {"Authorization": "Bearer " + create_access_token({"sub": self.username})}
+        # Writes go to quizzes this user owns; users without any just skip them.
+        self.own_quizzes = data.quizzes_by_user.get(self.user_id, [])
+
+    def unique(self, prefix: str) -> str:
+        self.sent += 1
+        return f"{prefix} {self.name} {self.sent}"
+
+    def own_question(self) -> int | None:
+        questions = [q for quiz in self.own_quizzes for q in self.data.questions_by_quiz.get(quiz, [])]
+        return self.rng.choice(questions) if questions else None
+
+    def submission(self) -> dict:
+        quiz_id = self.rng.choice(self.data.approved_quizzes)
+        answers = [self.rng.choice(self.data.answers_by_question[q]) for q in self.data.questions_by_quiz.get(quiz_id, [])]
+        return {"quiz_id": quiz_id, "answer_ids": answers}
+
+
+# (endpoint label, weight, request builder). Builders return (method, url, keyword arguments) or None to skip.
+def mix(u: VirtualUser):
+    rng, data = u.rng, u.data
+    own_question = u.own_question
+    return [
+        ("POST /register", 0.5, lambda: ("POST", "/register", {"json": {"display_name": "Load user", "username": u.unique("load").replace(" ", "_"), "password": PASSWORD}})),
+        ("POST /token", 0.5, lambda: ("POST", "/token", {"json": {"username": u.username, "password": PASSWORD}})),
+        ("GET /quiz", 12, lambda: ("GET", "/quiz", {"params": {"page": rng.randint(1, 5), "size": 20}})),
+        ("GET /quiz cursor", 4, lambda: ("GET", "/quiz", {"params": {"size": 20, "cursor": encode_cursor([rng.choice(data.approved_quizzes)])}})),
+        ("GET /quiz/{id}", 20, lambda: ("GET", f"/quiz/{rng.choice(data.approved_quizzes)}", {})),
+        ("GET /quiz/search", 6, lambda: ("GET", "/quiz/search", {"params": {"query": rng.choice(TOPICS), "size": 20}})),
+        ("GET /quiz/filter", 5, lambda: ("GET", "/quiz/filter", {"params": {"category_id": rng.choice(data.categories), "size": 20}})),
+        ("GET /quiz/user", 2, lambda: ("GET", "/quiz/user", {})),
+        ("GET /quiz/user/{id}", 2, lambda: ("GET", f"/quiz/user/{rng.choice(data.users)[0]}", {})),
+        ("POST /quiz", 1, lambda: ("POST", "/quiz", {"json": {"category_id": rng.choice(data.categories), "title": u.unique("Load quiz"), "description": "created by the load test"}})),
+        ("PUT /quiz/rate/{id}", 4, lambda: ("PUT", f"/quiz/rate/{rng.choice(data.approved_quizzes)}", {"params": {"rate": rng.randint(1, 5)}})),
+        ("POST /question", 2, lambda: u.own_quizzes and ("POST", "/question", {"json": {"quiz_id": rng.choice(u.own_quizzes), "text": u.unique("Load question")}})),
+        ("PUT /question/{id}", 2, lambda: (q := own_question()) and ("PUT", f"/question/{q}", {"json": {"quiz_id": 0, "text": u.unique("Edited question")}})),
+        ("POST /answer", 2, lambda: (q := own_question()) and ("POST", "/answer", {"json": {"question_id": q, "text": u.unique("Load answer"), "isCorrect": False}})),
+        ("PUT /answer/{id}", 2, lambda: (q := own_question()) and ("PUT", f"/answer/{rng.choice(data.answers_by_question[q])}", {"json": {"question_id": q, "text": u.unique("Edited answer"), "isCorrect": rng.random() < 0.25}})),
+        ("GET /category", 5, lambda: ("GET", "/category", {"params": {"size": 20}})),
+        ("GET /category/{id}", 3, lambda: ("GET", f"/category/{rng.choice(data.categories)}", {})),
+        ("GET /category/search", 2, lambda: ("GET", "/category/search", {"params": {"query": rng.choice(TOPICS)}})),
+        ("POST /category", 0.5, lambda: ("POST", "/category", {"json": {"name": u.unique("Load category"), "description": "created by the load test"}})),
+        ("GET /user", 3, lambda: ("GET", "/user", {})),
+        ("GET /user/users", 1, lambda: ("GET", "/user/users", {"params": {"size": 20}})),
+        ("GET /user/users/{id}", 2, lambda: ("GET", f"/user/users/{rng.choice(data.users)[0]}", {})),
+        ("GET /taken_quiz", 3, lambda: ("GET", "/taken_quiz", {})),
+        ("POST /taken_quiz/submit", 8, lambda: ("POST", "/taken_quiz/submit", {"json": u.submission()})),
+    ]
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+async def run_level(client: httpx.AsyncClient, data: Dataset, concurrency: int) -> dict:
+    samples: dict[str, list[tuple[float, int, bool]]] = {}
+    remaining = [args.requests]
+
+    async def worker(index: int):
+        user = VirtualUser(data, random.Random(f"{args.seed}-{concurrency}-{index}"), f"c{concurrency}w{index}")
+        endpoints = mix(user)
+        labels = [label for label, _, _ in endpoints]
+        weights = [weight for _, weight, _ in endpoints]
+        builders = dict((label, build) for label, _, build in endpoints)
+        while remaining[0] > 0:
+            label = user.rng.choices(labels, weights)[0]
+            request = builders[label]()
+            if not request:
+                continue
+            remaining[0] -= 1
+            method, url, kwargs = request
+            counter = [0]
+            statements.set(counter)
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, url, headers=user.headers, **kwargs)
+                failed = response.status_code >= 400
+            except Exception:
+                failed = True
+            finally:
+                statements.set(None)
+            samples.setdefault(label, []).append((time.perf_counter() - started, counter[0], failed))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    def summarize(entries: list[tuple[float, int, bool]]) -> dict:
+        latencies = [latency * 1000 for latency, _, _ in entries]
+        return {
+            "count": len(entries),
+            "errors": sum(failed for _, _, failed in entries),
+            "rps": len(entries) / elapsed,
+            "p50": percentile(latencies, 0.50),
+            "p95": percentile(latencies, 0.95),
+            "p99": percentile(latencies, 0.99),
+            "sql": sum(count for _, count, _ in entries) / len(entries),
+        }
+
+    return {
+        "elapsed": elapsed,
+        "total": summarize([entry for entries in samples.values() for entry in entries]),
+        "endpoints": {label: summarize(entries) for label, entries in sorted(samples.items())},
+    }
+
+
+def print_level(concurrency: int, result: dict):
+    total = result["total"]
+    print(f"\nconcurrency {concurrency}: {total['count']} requests in {result['elapsed']:.2f}s, "
+          f"{total['rps']:.1f} req/s, {total['errors']} errors")
+    print(f"{'endpoint':<26} {'count':>6} {'err':>4} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'sql/req':>8}")
+    for label, row in [*result["endpoints"].items(), ("all", total)]:
+        print(f"{label:<26} {row['count']:>6} {row['errors']:>4} {row['rps']:>8.1f} {row['p50']:>8.2f} "
+              f"{row['p95']:>8.2f} {row['p99']:>8.2f} {row['sql']:>8.2f}")
+
+
+def compare(results: dict, baseline: dict) -> list[str]:
+    regressions = []
+    for level, result in results["levels"].items():
+        before = baseline["levels"].get(level)
+        if before is None:
+            continue
+        if result["total"]["rps"] < before["total"]["rps"] * (1 - args.tolerance):
+            regressions.append(f"c={level} throughput {before['total']['rps']:.1f} -> {result['total']['rps']:.1f} req/s")
+        for label, row in result["endpoints"].items():
+            old = before["endpoints"].get(label)
+            if old is None:
+                continue
+            sampled = min(row["count"], old["count"]) >= args.min_samples
+            if sampled and row["p95"] > old["p95"] * (1 + args.tolerance):
+                regressions.append(f"c={level} {label} p95 {old['p95']:.2f} -> {row['p95']:.2f} ms")
+            # Statement counts barely depend on the machine, so half a statement per request already counts.
+            if row["sql"] > old["sql"] + 0.5:
+                regressions.append(f"c={level} {label} sql/req {old['sql']:.2f} -> {row['sql']:.2f}")
+            if row["errors"] > old["errors"]:
+                regressions.append(f"c={level} {label} errors {old['errors']} -> {row['errors']}")
+    return regressions
+
+
+async def main():
+    data = await seed(random.Random(args.seed))
+    results = {"dialect": engine.dialect.name, "settings": {key: getattr(args, key) for key in
+               ("requests", "users", "categories", "quizzes", "questions", "seed")}, "levels": {}}
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://load-test", timeout=None) as client:
+            # One pass over every endpoint first, so statement compilation and cold caches stay out of the numbers.
+            warmup = VirtualUser(data, random.Random(args.seed), "warmup")
+            for _, _, build in mix(warmup):
+                request = build()
+                if request:
+                    method, url, kwargs = request
+                    await client.request(method, url, headers=warmup.headers, **kwargs)
+            print(f"{engine.dialect.name}: {args.quizzes} quizzes x {args.questions} questions, {args.users} users, "
+                  f"{args.requests} requests per level")
+            for concurrency in [int(level) for level in args.concurrency.split(",")]:
+                result = await run_level(client, data, concurrency)
+                results["levels"][str(concurrency)] = result
+                print_level(concurrency, result)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nbaseline written to {args.save}")
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file))
+        print(f"\n{len(regressions)} regressions against {args.compare}")
+        for line in regressions:
+            print("  " + line)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
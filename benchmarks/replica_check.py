@@ -0,0 +1,73 @@
+import argparse
+import asyncio
+import os
+import sys
+
+parser = argparse.ArgumentParser(
+    description="Check read-replica routing against two databases that do not replicate: rows written through the "
+                "primary are invisible on the replica, so where a read was served shows up in its result.")
+parser.add_argument("--primary", default="sqlite+aiosqlite:///replica_check_primary.db")
+parser.add_argument("--replica", default="sqlite+aiosqlite:///replica_check_replica.db")
+parser.add_argument("--window", type=float, default=1.0, help="read-your-writes window in seconds")
+args = parser.parse_args()
+
+os.environ["DATABASEURL"] = args.primary
+os.environ["DBREPLICAURLS"] = args.replica
+os.environ["DBREADYOURWRITESWINDOW"] = str(args.window)
+os.environ.setdefault("DBPROFILE", "benchmark")
+
+from sqlalchemy import delete
+
+from database.db import Base, engine, replica_engines, sessionLocal
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+from database.operations import category_operations
+from database.routing import set_user, use_primary
+
+
+async def reset():
+    for target in (engine, *replica_engines):
+        async with target.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+            for model in (Answer, Question, TakenQuiz, Quiz, Category, User):
+                await conn.execute(delete(model))
+
+
+async def seen_by(user: str | None, category_id: int) -> str:
+    set_user(user)
+    category = await category_operations.get_category_by_id(category_id, sessionLocal())
+    return "primary" if category is not None else "replica"
+
+
+async def main():
+    await reset()
+    set_user("writer")
+    await category_operations.create_category(Category(name="Routed", description="written to the primary"),
+                                              sessionLocal())
+    with use_primary():
+        category_id = (await category_operations.get_category_by_name("Routed", sessionLocal())).id
+
+    checks = [
+        ("anonymous read goes to the replica", await seen_by(None, category_id), "replica"),
+        ("other user's read goes to the replica", await seen_by("reader", category_id), "replica"),
+        ("writer's read inside the window goes to the primary", await seen_by("writer", category_id), "primary"),
+    ]
+    await asyncio.sleep(args.window + 0.1)
+    checks.append(("writer's read after the window goes to the replica", await seen_by("writer", category_id), "replica"))
+
+    failures = 0
+    for label, served, expected in checks:
+        failures += served != expected
+        print(f"{'ok  ' if served == expected else 'FAIL'} {label}: served by {served}")
+    await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,120 @@
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+parser = argparse.ArgumentParser(description="Compare LIKE search against the full-text search index.")
+parser.add_argument("--url", default="sqlite+aiosqlite:///search_benchmark.db")
+parser.add_argument("--quizzes", type=int, default=1_000_000)
+parser.add_argument("--queries", type=int, default=50)
+parser.add_argument("--batch", type=int, default=10_000)
+parser.add_argument("--seed", type=int, default=42)
+parser.add_argument("--reuse", action="store_true", help="skip seeding when the quizzes table is already populated")
+args = parser.parse_args()
+
+os.environ["DATABASEURL"] = args.url
+os.environ.setdefault("DBPROFILE", "benchmark")
+
+from sqlalchemy import select, insert, func, delete
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import load_only, joinedload
+
+from database.db import Base, engine, sessionLocal
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+from database.operations import quiz_operations
+from database.search import install_search_indexes
+
+SYLLABLES = ["ka", "lo", "mi", "ne", "ru", "ta", "phy", "sic", "chem", "bio", "geo", "his", "to", "ry", "mat", "hem"]
+
+
+def make_vocabulary(rng: random.Random, size: int = 5000) -> list[str]:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+async def seed(vocabulary: list[str], rng: random.Random):
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await install_search_indexes(conn)
+        existing = (await conn.execute(select(func.count()).select_from(Quiz))).scalar_one()
+        if args.reuse and existing >= args.quizzes:
+            return existing
+        await conn.execute(delete(Quiz))
+        await conn.execute(delete(Category))
+        await conn.execute(delete(User))
+        user_id = (await conn.execute(insert(User).returning(User.id),
+                                      [{"display_name": "Bench", "username": "bench", "password": "x", "role": "user"}])).scalar_one()
+        category_id = (await conn.execute(insert(Category).returning(Category.id),
+                                          [{"name": "Bench", "description": "bench", "approved": True}])).scalar_one()
+    started = time.perf_counter()
+    for offset in range(0, args.quizzes, args.batch):
+        rows = [{
+            "user_id": user_id,
+            "category_id": category_id,
+            "approved": rng.random() < 0.8,
+            "total_rate": 0.0,
+            "rate_count": 0,
+            "title": " ".join(rng.choices(vocabulary, k=4)),
+            "description": " ".join(rng.choices(vocabulary, k=25)),
+        } for _ in range(min(args.batch, args.quizzes - offset))]
+        async with engine.begin() as conn:
+            await conn.execute(insert(Quiz), rows)
+    print(f"seeded {args.quizzes} quizzes in {time.perf_counter() - started:.1f}s")
+    if engine.dialect.name == "postgresql":
+        async with engine.connect() as conn:
+            await conn.execution_options(isolation_level="AUTOCOMMIT")
+            await conn.exec_driver_sql("VACUUM ANALYZE quizzes")
+    return args.quizzes
+
+
+# The pre-index implementation of search_approved_quizzes, kept here as the baseline.
+async def like_search(query: str, page: int, size: int, db: AsyncSession):
+    total_query = select(func.count()).select_from(Quiz)
+    stmt = (select(Quiz).offset((page-1)*size).limit(size).
+            options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
+                    joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
+            .where((Quiz.approved == True) & Quiz.title.like(f'%{query}%')))
+    async with db as session:
+        quizzes = await session.execute(stmt)
+        total = (await session.execute(total_query)).scalars().one()
+        return {"total": total, "items": quizzes.scalars().unique().all()}
+
+
+async def measure(label: str, search, terms: list[str]):
+    timings = []
+    for term in terms:
+        async with sessionLocal() as session:
+            started = time.perf_counter()
+            await search(term, 1, 10, session)
+            timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    print(f"{label:>5}: mean {statistics.mean(timings):8.2f} ms  "
+          f"p50 {timings[len(timings) // 2]:8.2f} ms  p95 {timings[int(len(timings) * 0.95) - 1]:8.2f} ms")
+
+
+async def main():
+    rng = random.Random(args.seed)
+    vocabulary = make_vocabulary(rng)
+    count = await seed(vocabulary, rng)
+    hits = rng.choices(vocabulary, k=args.queries)
+    # LIMIT lets LIKE stop early on common words; words that match nothing force it through the whole table.
+    misses = [word + "zq" for word in rng.choices(vocabulary, k=args.queries)]
+    print(f"{engine.dialect.name}, {count} quizzes, {args.queries} single-word searches per set, first page of 10")
+    for label, terms in (("matching words", hits), ("unmatched words", misses)):
+        print(label)
+        await measure("LIKE", like_search, terms)
+        await measure("FTS", quiz_operations.search_approved_quizzes, terms)
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
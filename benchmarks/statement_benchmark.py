@@ -0,0 +1,115 @@
+import argparse
+import asyncio
+import os
+import time
+
+parser = argparse.ArgumentParser(description="Compare statements rebuilt on every call against the prebuilt ones in "
+                                             "database.statements.")
+parser.add_argument("--url", default="sqlite+aiosqlite:///statement_benchmark.db")
+parser.add_argument("--iterations", type=int, default=2000)
+args = parser.parse_args()
+
+os.environ["DATABASEURL"] = args.url
+os.environ.setdefault("DBPROFILE", "benchmark")
+
+from sqlalchemy import select, insert, delete, func
+from sqlalchemy.orm import load_only, joinedload
+
+from database import statements
+from database.db import Base, engine, sessionLocal
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+
+
+# The statements as the operations built them before, one fresh construct per call.
+def quiz_by_id(id: int):
+    return (select(Quiz).
+            options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.average_rate, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
+                    joinedload(Quiz.questions).load_only(Question.id, Question.text)
+                    .joinedload(Question.answers).load_only(Answer.id, Answer.text, Answer.isCorrect),
+                    joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
+            .where(Quiz.id == id))
+
+
+def approved_quiz_page(offset: int, limit: int):
+    query = (select(Quiz).
+             options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.average_rate, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
+                     joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
+             .where(Quiz.approved == True))
+    return (query.order_by(Quiz.id).offset(offset).limit(limit)
+            .add_columns(func.count().over().label("total")))
+
+
+def approved_category_page(offset: int, limit: int):
+    query = (select(Category)
+             .where(Category.approved == True)
+             .options(load_only(Category.id, Category.name, Category.description, Category.approved)))
+    return (query.order_by(Category.id).offset(offset).limit(limit)
+            .add_columns(func.count().over().label("total")))
+
+
+def user_by_username(username: str):
+    return select(User).where(User.username == username)
+
+
+CASES = [
+    ("quiz by id", lambda: quiz_by_id(1), statements.QUIZ_BY_ID, {"id": 1}),
+    ("approved quiz page", lambda: approved_quiz_page(0, 10), statements.APPROVED_QUIZ_LISTING.counted_page,
+     {"offset": 0, "limit": 10}),
+    ("approved category page", lambda: approved_category_page(0, 10), statements.APPROVED_CATEGORY_LISTING.counted_page,
+     {"offset": 0, "limit": 10}),
+    ("user by username", lambda: user_by_username("bench"), statements.USER_BY_USERNAME, {"username": "bench"}),
+]
+
+
+async def seed():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for model in (Answer, Question, TakenQuiz, Quiz, Category, User):
+            await conn.execute(delete(model))
+        user_id = (await conn.execute(insert(User).returning(User.id),
+                                      [{"display_name": "Bench", "username": "bench", "password": "x", "role": "user"}])).scalar_one()
+        category_id = (await conn.execute(insert(Category).returning(Category.id),
+                                          [{"name": "Bench", "description": "bench", "approved": True}])).scalar_one()
+        await conn.execute(insert(Quiz), [{"id": i, "user_id": user_id, "category_id": category_id, "approved": True,
+                                           "title": f"Quiz {i}", "description": "benchmark quiz", "total_rate": 0,
+                                           "rate_count": 0} for i in range(1, 51)])
+        await conn.execute(insert(Question), [{"id": i, "quiz_id": 1, "text": f"Question {i}"} for i in range(1, 11)])
+        await conn.execute(insert(Answer), [{"question_id": q, "text": f"Answer {a}", "isCorrect": a == 0}
+                                            for q in range(1, 11) for a in range(4)])
+
+
+def build_and_key(build) -> float:
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        build()._generate_cache_key()
+    return (time.perf_counter() - started) * 1_000_000 / args.iterations
+
+
+async def execute(session, build, params) -> float:
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        (await session.execute(build(), params)).unique().all()
+        session.expunge_all()
+    return (time.perf_counter() - started) * 1_000_000 / args.iterations
+
+
+async def main():
+    await seed()
+    print(f"{engine.dialect.name}: {args.iterations} iterations per case, microseconds per call")
+    print(f"{'statement':<24} {'build+key':>10} {'prebuilt':>10} {'execute':>10} {'prebuilt':>10}")
+    async with sessionLocal() as session:
+        for label, rebuild, prebuilt, params in CASES:
+            await execute(session, rebuild, {})
+            await execute(session, lambda: prebuilt, params)
+            print(f"{label:<24} {build_and_key(rebuild):>10.1f} {build_and_key(lambda: prebuilt):>10.1f} "
+                  f"{await execute(session, rebuild, {}):>10.1f} {await execute(session, lambda: prebuilt, params):>10.1f}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
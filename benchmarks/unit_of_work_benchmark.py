@@ -0,0 +1,87 @@
+import argparse
+import os
+import time
+
+parser = argparse.ArgumentParser(description="Count pool checkouts and time per request for routes that chain several operations.")
+parser.add_argument("--url", default="sqlite+aiosqlite:///unit_of_work_benchmark.db")
+parser.add_argument("--requests", type=int, default=200, help="requests per route")
+args = parser.parse_args()
+
+os.environ["DATABASEURL"] = args.url
+os.environ.setdefault("DBPROFILE", "benchmark")
+os.environ.setdefault("SECRETKEY", "unit-of-work-benchmark-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("USERNAME", "adminUser")
+os.environ.setdefault("PASSWORD", "Admin@123")
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from database.db import Base, engine
+from main import app
+
+checkouts = [0]
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def count_checkout(dbapi_connection, connection_record, connection_proxy):
+    checkouts[0] += 1
+
+
+def reset_schema():
+    import asyncio
+
+    async def drop():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+        await engine.dispose()
+    asyncio.run(drop())
+
+
+def seed(client: TestClient) -> dict:
+    admin = {"Authorization": "Bearer " + client.post("/token", json={"username": os.environ["USERNAME"],
+                                                                       "password": os.environ["PASSWORD"]}).json()["access_token"]}
+    user = {"Authorization": "Bearer " + client.post("/register", json={"display_name": "Bench", "username": "bench",
+                                                                          "password": "Bench@12345"}).json()["access_token"]}
+    client.post("/category", json={"name": "Bench", "description": "benchmark category"}, headers=user)
+    client.put("/category/approve/1?approved=true", headers=admin)
+    client.post("/quiz", json={"category_id": 1, "title": "Bench quiz", "description": "benchmark quiz"}, headers=user)
+    client.post("/question", json={"quiz_id": 1, "text": "Which one?"}, headers=user)
+    client.post("/answer/bulk", json=[{"question_id": 1, "text": f"Answer {i}", "isCorrect": i == 0} for i in range(4)],
+                headers=user)
+    client.put("/quiz/approve/1?approved=true", headers=admin)
+    return user
+
+
+ROUTES = [
+    ("GET /quiz/{id}", lambda c, h, i: c.get("/quiz/1", headers=h)),
+    ("GET /quiz", lambda c, h, i: c.get("/quiz?page=1&size=10", headers=h)),
+    ("PUT /answer/{id}", lambda c, h, i: c.put("/answer/1", json={"question_id": 1, "text": f"Answer {i}", "isCorrect": True},
+                                               headers=h)),
+    ("PUT /question/{id}", lambda c, h, i: c.put("/question/1", json={"quiz_id": 1, "text": f"Which one {i}?"}, headers=h)),
+    ("PUT /quiz/rate/{id}", lambda c, h, i: c.put("/quiz/rate/1?rate=4", headers=h)),
+    ("POST /taken_quiz/submit", lambda c, h, i: c.post("/taken_quiz/submit", json={"quiz_id": 1, "answer_ids": [1]}, headers=h)),
+    ("PUT /quiz/{id}", lambda c, h, i: c.put("/quiz/1", json={"category_id": 1, "title": f"Bench quiz {i}",
+                                                              "description": "benchmark quiz"}, headers=h)),
+]
+
+
+def main():
+    reset_schema()
+    with TestClient(app) as client:
+        headers = seed(client)
+        print(f"{engine.dialect.name}: {args.requests} requests per route")
+        print(f"{'route':<24} {'checkouts/request':>18} {'ms/request':>11}")
+        for label, call in ROUTES:
+            call(client, headers, -1)
+            checkouts[0] = 0
+            started = time.perf_counter()
+            for i in range(args.requests):
+                response = call(client, headers, i)
+                assert response.status_code < 300, (label, response.status_code, response.text)
+            elapsed = time.perf_counter() - started
+            print(f"{label:<24} {checkouts[0] / args.requests:>18.2f} {elapsed * 1000 / args.requests:>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+from typing import Callable
+
+from sqlalchemy import inspect, text
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+AVERAGE_RATE = "CASE WHEN rate_count > 0 THEN total_rate / rate_count ELSE 0 END"
+
+
+def _average_rate(dialect: str) -> str:
+    if dialect == "postgresql":
+        return f"double precision GENERATED ALWAYS AS ({AVERAGE_RATE}) STORED"
+    # SQLite can only add a virtual generated column to an existing table; it reads the same.
+    return f"REAL GENERATED ALWAYS AS ({AVERAGE_RATE}) VIRTUAL"
+
+
+def _revision(dialect: str) -> str:
+    return "INTEGER NOT NULL DEFAULT 0"
+
+
+# (table, column, DDL for the dialect) for columns declared after their table first shipped.
+ADDED_COLUMNS: list[tuple[str, str, Callable[[str], str]]] = [
+    ("quizzes", "average_rate", _average_rate),
+    ("quizzes", "revision", _revision),
+    ("categories", "revision", _revision),
+]
+
+
+def _column_names(conn, table: str) -> set[str]:
+    return {column["name"] for column in inspect(conn).get_columns(table)}
+
+
+# create_all never alters a table that already exists, so databases created before a column was declared get it here.
+async def install_columns(conn: AsyncConnection):
+    dialect = conn.dialect.name
+    for table, column, ddl in ADDED_COLUMNS:
+        if column not in await conn.run_sync(_column_names, table):
+            await conn.execute(text(f'ALTER TABLE "{table}" ADD COLUMN {column} {ddl(dialect)}'))
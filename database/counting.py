@@ -0,0 +1,73 @@
+import json
+import os
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from utils.lru_cache import LRUCache
+
+# exact: count(*) OVER () on every page
+# cached: exact counts kept per filter until a write to the table invalidates them
+# estimated: planner row estimates once they exceed COUNTESTIMATETHRESHOLD (PostgreSQL only)
+COUNT_MODE = os.getenv("COUNTMODE", "exact")
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("COUNTESTIMATETHRESHOLD", "100000"))
+COUNT_CACHE_TTL = float(os.getenv("COUNTCACHETTL", "300"))
+COUNT_CACHE_SIZE = int(os.getenv("COUNTCACHESIZE", "1024"))
+
+_counts = LRUCache(COUNT_CACHE_SIZE, COUNT_CACHE_TTL)
+
+
+class Explain(Executable, ClauseElement):
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def _table_name(query: Select) -> str:
+    return query.columns_clause_froms[0].name
+
+
+# Prebuilt listings carry their filter values in params rather than in the statement's own bind values.
+def _count_key(query: Select, params: dict) -> tuple:
+    cache_key = query._generate_cache_key()
+    return (_table_name(query), cache_key.key, tuple(bind.effective_value for bind in cache_key.bindparams),
+            tuple(sorted(params.items())))
+
+
+async def estimate_count(query: Select, session: AsyncSession, params: dict) -> int | None:
+    if session.bind.dialect.name != "postgresql":
+        return None
+    result = await session.execute(Explain(query), params)
+    plan = result.scalar_one()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+async def known_count(query: Select, session: AsyncSession, params: dict) -> tuple[int, bool] | None:
+    if COUNT_MODE == "cached":
+        total = _counts.get(_count_key(query, params))
+        if total is not None:
+            return total, True
+    elif COUNT_MODE == "estimated":
+        estimate = await estimate_count(query, session, params)
+        if estimate is not None and estimate >= COUNT_ESTIMATE_THRESHOLD:
+            return estimate, False
+    return None
+
+
+def remember_count(query: Select, total: int, params: dict):
+    if COUNT_MODE == "cached":
+        _counts.set(_count_key(query, params), total)
+
+
+def invalidate_counts(*tables: str):
+    _counts.pop_where(lambda key, total: key[0] in tables)
@@ -1,13 +1,106 @@
 import os
+import time
 
-from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, AsyncEngine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from database.routing import routing_session
+from utils.instrumentation import instrument_engine
+from utils.metrics import Counter, Gauge, Histogram
 
 DATABASE_URL = os.getenv("DATABASEURL")
+# Comma separated; when set, plain reads are spread over these and everything else stays on DATABASEURL.
+DATABASE_REPLICA_URLS = [url.strip() for url in os.getenv("DBREPLICAURLS", "").split(",") if url.strip()]
+
+# Named engine profiles; DBPROFILE picks one and the individual DB* variables override its values.
+ENGINE_PROFILES = {
+    "dev": {"echo": True, "pool_size": 5, "max_overflow": 10, "pool_timeout": 30, "pool_recycle": -1,
+            "pool_pre_ping": False, "statement_cache_size": 100},
+    "prod": {"echo": False, "pool_size": 20, "max_overflow": 10, "pool_timeout": 10, "pool_recycle": 1800,
+             "pool_pre_ping": True, "statement_cache_size": 500},
+    "benchmark": {"echo": False, "pool_size": 50, "max_overflow": 0, "pool_timeout": 30, "pool_recycle": -1,
+                  "pool_pre_ping": False, "statement_cache_size": 500},
+}
+ENGINE_SETTINGS = {
+    "echo": ("DBECHO", lambda value: value.lower() in ("1", "true", "yes")),
+    "pool_size": ("DBPOOLSIZE", int),
+    "max_overflow": ("DBMAXOVERFLOW", int),
+    "pool_timeout": ("DBPOOLTIMEOUT", float),
+    "pool_recycle": ("DBPOOLRECYCLE", int),
+    "pool_pre_ping": ("DBPOOLPREPING", lambda value: value.lower() in ("1", "true", "yes")),
+    # asyncpg's per-connection prepared statement cache; 0 behind pgbouncer in transaction mode.
+    "statement_cache_size": ("DBSTATEMENTCACHESIZE", int),
+}
+
+_checkout_wait = Histogram("db_pool_checkout_wait_seconds",
+                           "Time spent getting a connection from the pool, including opening a new one.",
+                           buckets=(.0001, .0005, .001, .005, .01, .025, .05, .1, .25, .5, 1, 2.5, 5, 10, 30))
+_checkout_timeouts = Counter("db_pool_checkout_timeouts_total", "Checkouts that gave up after DBPOOLTIMEOUT.")
+_waiting = [0]
+
+
+class InstrumentedPool(AsyncAdaptedQueuePool):
+    def _do_get(self):
+        _waiting[0] += 1
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            _checkout_timeouts.inc()
+            raise
+        finally:
+            _waiting[0] -= 1
+            _checkout_wait.observe(time.perf_counter() - started)
+
+
+def engine_settings(profile: str) -> dict:
+    if profile not in ENGINE_PROFILES:
+        raise ValueError(f"Unknown DBPROFILE {profile!r}, expected one of {', '.join(ENGINE_PROFILES)}")
+    settings = dict(ENGINE_PROFILES[profile])
+    for key, (variable, parse) in ENGINE_SETTINGS.items():
+        if os.getenv(variable):
+            settings[key] = parse(os.getenv(variable))
+    return settings
+
+
+def make_engine(url: str, profile: str = "dev") -> AsyncEngine:
+    settings = engine_settings(profile)
+    url = make_url(url)
+    statement_cache_size = settings.pop("statement_cache_size")
+    kwargs = {}
+    if url.get_driver_name() == "asyncpg":
+        kwargs["connect_args"] = {"prepared_statement_cache_size": statement_cache_size}
+    # In-memory SQLite runs on a single shared connection (StaticPool), which takes no sizing.
+    if not issubclass(url.get_dialect().get_pool_class(url), QueuePool):
+        return create_async_engine(url, echo=settings["echo"], **kwargs)
+    return create_async_engine(url, poolclass=InstrumentedPool, **settings, **kwargs)
+
+
+DATABASE_PROFILE = os.getenv("DBPROFILE", "dev")
+
+engine = make_engine(DATABASE_URL, DATABASE_PROFILE)
+replica_engines = [make_engine(url, DATABASE_PROFILE) for url in DATABASE_REPLICA_URLS]
+for instrumented in (engine, *replica_engines):
+    instrument_engine(instrumented)
+
+sessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession,
+                            sync_session_class=routing_session([replica.sync_engine for replica in replica_engines]))
+
+Base = declarative_base()
+
 
-engine = create_async_engine(DATABASE_URL, echo=True)
+def _pool_value(read) -> float:
+    return read(engine.pool) if isinstance(engine.pool, QueuePool) else 0
 
-sessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=AsyncSession)
 
-Base = declarative_base()
\ No newline at end of file
+Gauge("db_pool_size", "Connections the pool keeps open.", lambda: _pool_value(lambda pool: pool.size()))
+Gauge("db_pool_checked_out", "Connections currently checked out of the pool.",
+      lambda: _pool_value(lambda pool: pool.checkedout()))
+Gauge("db_pool_capacity", "Connections the pool may hand out at once, overflow included.",
+      lambda: _pool_value(lambda pool: pool.size() + max(pool._max_overflow, 0)))
+Gauge("db_pool_saturation", "Checked out connections as a fraction of the pool capacity.",
+      lambda: _pool_value(lambda pool: pool.checkedout() / (pool.size() + max(pool._max_overflow, 0) or 1)))
+Gauge("db_pool_waiting", "Checkouts currently waiting for a connection.", lambda: _waiting[0])
@@ -1,6 +1,6 @@
-from database.db import sessionLocal
+from database.unit_of_work import unit_of_work
 
 
 async def get_db():
-    async with sessionLocal() as session:
+    async with unit_of_work() as session:
         yield session
@@ -0,0 +1,51 @@
+from dataclasses import dataclass
+from typing import Iterable
+
+
+@dataclass(frozen=True)
+class AnswerKey:
+    approved: bool
+    # the quiz revision the key was built from; any question or answer edit bumps it
+    revision: int
+    # answer id -> (question position, the answer's bit within that question)
+    answers: dict[int, tuple[int, int]]
+    # per question position, the bitmask of its correct answers
+    correct: tuple[int, ...]
+
+    # Questions without a correct answer are not graded: skipping them would otherwise always score.
+    @property
+    def total(self) -> int:
+        return sum(1 for expected in self.correct if expected)
+
+    # A question counts as correct when exactly its correct answers were selected.
+    def grade(self, answer_ids: Iterable[int]) -> int:
+        selected = [0] * len(self.correct)
+        for id in answer_ids:
+            question, bit = self.answers[id]
+            selected[question] |= bit
+        return sum(1 for chosen, expected in zip(selected, self.correct) if expected and chosen == expected)
+
+
+# rows are (question_id, answer_id, isCorrect); answer columns are None for questions without answers.
+def build_answer_key(approved: bool, revision: int,
+                     rows: Iterable[tuple[int | None, int | None, bool | None]]) -> AnswerKey:
+    answers: dict[int, tuple[int, int]] = {}
+    correct: list[int] = []
+    sizes: list[int] = []
+    positions: dict[int, int] = {}
+    for question_id, answer_id, is_correct in rows:
+        if question_id is None:
+            continue
+        if question_id not in positions:
+            positions[question_id] = len(correct)
+            correct.append(0)
+            sizes.append(0)
+        if answer_id is None:
+            continue
+        position = positions[question_id]
+        bit = 1 << sizes[position]
+        sizes[position] += 1
+        answers[answer_id] = (position, bit)
+        if is_correct:
+            correct[position] |= bit
+    return AnswerKey(approved, revision, answers, tuple(correct))
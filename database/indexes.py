@@ -0,0 +1,14 @@
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+from database.db import Base
+
+
+# create_all skips tables that already exist, indexes included, so databases created before an index was declared get it here.
+def _create_missing_indexes(conn):
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(conn, checkfirst=True)
+
+
+async def install_indexes(conn: AsyncConnection):
+    await conn.run_sync(_create_missing_indexes)
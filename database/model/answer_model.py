@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.db import Base
@@ -6,6 +6,7 @@ from database.db import Base
 
 class Answer(Base):
     __tablename__ = "answers"
+    __table_args__ = (Index("ix_answers_question_id_id", "question_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True, autoincrement=True, unique = True)
     question_id: Mapped[int] = mapped_column(ForeignKey("questions.id"), nullable = False)
@@ -1,5 +1,6 @@
 from typing import Optional
 
+from sqlalchemy import Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.db import Base
@@ -7,10 +8,12 @@ from database.db import Base
 
 class Category(Base):
     __tablename__ = "categories"
+    __table_args__ = (Index("ix_categories_approved_id", "approved", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True, unique=True, autoincrement=True)
     name: Mapped[str] = mapped_column(unique=True, nullable=False)
     description: Mapped[str] = mapped_column(nullable=False)
     approved: Mapped[bool] = mapped_column(default=False, nullable=False)
+    revision: Mapped[int] = mapped_column(default=0, nullable=False)
 
     quizzes: Mapped[Optional[list["Quiz"]]] = relationship(back_populates="category", cascade="all, delete")
\ No newline at end of file
@@ -1,6 +1,6 @@
 from typing import Optional
 
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.db import Base
@@ -8,6 +8,7 @@ from database.db import Base
 
 class Question(Base):
     __tablename__ = "questions"
+    __table_args__ = (Index("ix_questions_quiz_id_id", "quiz_id", "id"),)
 
     id: Mapped[int] = mapped_column(primary_key=True, index=True, unique=True, autoincrement=True)
     quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id"), nullable = False)
@@ -1,22 +1,33 @@
 from typing import Optional
 
-from sqlalchemy import Column, Integer, ForeignKey, Double, Boolean, String
+from sqlalchemy import Column, Integer, ForeignKey, Double, Boolean, String, Computed, Index
 from sqlalchemy.orm import relationship, Mapped, mapped_column
 
+from database.columns import AVERAGE_RATE
 from database.db import Base
 
 
 class Quiz(Base):
     __tablename__ = "quizzes"
+    # Listings filter on approval/category/owner and page by id, so id trails each index.
+    __table_args__ = (
+        Index("ix_quizzes_approved_id", "approved", "id"),
+        Index("ix_quizzes_approved_category_id_id", "approved", "category_id", "id"),
+        Index("ix_quizzes_category_id_id", "category_id", "id"),
+        Index("ix_quizzes_user_id_approved_id", "user_id", "approved", "id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, unique=True, autoincrement = True, index = True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.id'), nullable = False)
     total_rate: Mapped[float] = mapped_column(default=0.0, nullable=False)
     rate_count: Mapped[int] = mapped_column(default=0, nullable=False)
+    average_rate: Mapped[float] = mapped_column(Computed(AVERAGE_RATE, persisted=True))
     category_id: Mapped[int] = mapped_column(ForeignKey('categories.id'), nullable=False)
     approved: Mapped[bool] = mapped_column(default=False, nullable=False)
     title: Mapped[str] = mapped_column(nullable=False)
     description: Mapped[str] = mapped_column(nullable=False)
+    # Bumped by every write that changes what GET /quiz/{id} returns; it is the document's ETag.
+    revision: Mapped[int] = mapped_column(default=0, nullable=False)
     user: Mapped["User"] = relationship(back_populates="quizzes")
     questions: Mapped[Optional[list["Question"]]] = relationship(back_populates="quiz", cascade="all, delete")
     category: Mapped["Category"] = relationship(back_populates="quizzes")
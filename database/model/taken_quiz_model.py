@@ -1,4 +1,4 @@
-from sqlalchemy import ForeignKey
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from database.db import Base
@@ -6,6 +6,10 @@ from database.db import Base
 
 class TakenQuiz(Base):
     __tablename__ = 'takenQuizzes'
+    __table_args__ = (
+        Index("ix_takenQuizzes_user_id_id", "user_id", "id"),
+        Index("ix_takenQuizzes_quiz_id", "quiz_id"),
+    )
 
     id: Mapped[int] = mapped_column(primary_key=True, unique=True, autoincrement=True, index=True)
     quiz_id: Mapped[int] = mapped_column(ForeignKey("quizzes.id"), nullable=False)
@@ -1,87 +1,73 @@
 from fastapi import HTTPException
-from sqlalchemy import select, update, delete
+from sqlalchemy import update, delete, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import load_only
 
+from database import statements
 from database.model.answer_model import Answer
-from database.model.question_model import Question
-from database.model.quiz_model import Quiz
+from database.operations.ownership_operations import resolve_question_owners, resolve_answer_owners
+from database.operations.quiz_operations import bump_revisions
+from database.quiz_cache import invalidate_quiz
+from database.unit_of_work import operation, commit, after_commit
 from models.requests.answer_request import AnswerRequest
 
 
-async def create_answer(answer: Answer, db: AsyncSession):
-    async with db as session:
+# The single-answer operations take the quiz id the route already resolved while checking ownership.
+async def create_answer(answer: Answer, quiz_id: int, db: AsyncSession):
+    async with operation(db) as session:
         session.add(answer)
         await session.flush()
-        await session.commit()
+        await bump_revisions([quiz_id], session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, quiz_id)
 
 async def bulk_add_answers(user_id: int, answers: list[AnswerRequest], db: AsyncSession):
     question_ids = {a.question_id for a in answers}
+    owners = await resolve_question_owners(question_ids, db)
 
-    # Step 1: Fetch allowed question_ids
-    stmt = (
-        select(Question.id)
-        .join(Quiz)
-        .where(
-            Question.id.in_(question_ids),
-            Quiz.user_id == user_id
-        )
-    )
-    result = await db.execute(stmt)
-    allowed_question_ids = {row[0] for row in result.all()}
-
-    # Step 2: Filter answers
-    valid_answers = [
-        Answer(**a.model_dump()) for a in answers if a.question_id in allowed_question_ids
-    ]
-
-    # Optional: Raise error if invalid
-    invalid_ids = question_ids - allowed_question_ids
+    invalid_ids = {id for id in question_ids if id not in owners or owners[id].user_id != user_id}
     if invalid_ids:
         raise HTTPException(
             status_code=403,
             detail=f"You don't have access to question IDs: {invalid_ids}"
         )
 
-    # Step 3: Bulk add
-    db.add_all(valid_answers)
-    await db.commit()
+    async with operation(db) as session:
+        # A plain executemany: adding ORM objects would fetch each new id back, one INSERT ... RETURNING per answer.
+        await session.execute(insert(Answer), [a.model_dump() for a in answers])
+        quiz_ids = {owner.quiz_id for owner in owners.values()}
+        await bump_revisions(quiz_ids, session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, *quiz_ids)
 
 async def get_answer_by_id(id: int, db: AsyncSession):
-    query = select(Answer).where(Answer.id == id).options(
-        load_only(
-            Answer.id,
-            Answer.question_id
-        )
-    )
-    async with db as session:
-        answer = await session.execute(query)
+    async with operation(db) as session:
+        answer = await session.execute(statements.ANSWER_BY_ID, {"id": id})
         return answer.scalars().one_or_none()
 
-async def update_answer(id: int, answer: AnswerRequest, db: AsyncSession):
+async def update_answer(id: int, quiz_id: int, answer: AnswerRequest, db: AsyncSession):
     query = update(Answer).where(Answer.id == id).values(text=answer.text, isCorrect=answer.isCorrect)
-    async with db as session:
+    async with operation(db) as session:
         await session.execute(query)
-        await session.commit()
+        await bump_revisions([quiz_id], session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, quiz_id)
 
-async def delete_answer(id: int, db: AsyncSession):
-    async with db as session:
+async def delete_answer(id: int, quiz_id: int, db: AsyncSession):
+    async with operation(db) as session:
         await session.execute(delete(Answer).where(Answer.id == id))
-        await session.commit()
+        await bump_revisions([quiz_id], session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, quiz_id)
 
 async def bulk_delete_answers(user_id: int, id: list[int], db: AsyncSession):
-    async with db as session:
-        subquery = (
-            select(Answer.id)
-            .join(Question, Answer.question_id == Question.id)
-            .join(Quiz, Question.quiz_id == Quiz.id)
-            .where(
-                Answer.id.in_(id),
-                Quiz.user_id == user_id
-            )
-        )
-
-        # Delete only answers in that subquery
-        stmt = delete(Answer).where(Answer.id.in_(subquery))
-        await session.execute(stmt)
-        await session.commit()
\ No newline at end of file
+    owners = await resolve_answer_owners(id, db)
+    # Answers the user doesn't own are skipped rather than rejected.
+    owned = [answer_id for answer_id, owner in owners.items() if owner.user_id == user_id]
+    if not owned:
+        return
+    async with operation(db) as session:
+        await session.execute(delete(Answer).where(Answer.id.in_(owned)))
+        quiz_ids = {owners[answer_id].quiz_id for answer_id in owned}
+        await bump_revisions(quiz_ids, session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, *quiz_ids)
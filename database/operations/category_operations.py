@@ -1,154 +1,89 @@
 from typing import Any, Coroutine, Sequence
 
-from sqlalchemy import select, Row, RowMapping, update, delete, func
+from sqlalchemy import Row, RowMapping, update, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, load_only
+from sqlalchemy.orm import joinedload
 
+from database.counting import invalidate_counts
+from database.quiz_cache import invalidate_quizzes_where
 from database.model.category_model import Category
+from database.model.quiz_model import Quiz
+from database import statements
+from database.pagination import paginate, Listing
+from database.search import full_text_search, CATEGORY_SEARCH
+from database.suggestions import suggestion_index, CATEGORY, QUIZ
+from database.unit_of_work import operation, commit, after_commit
 from models.requests.category_request import CategoryRequest
 
 
-async def get_approved_categories(page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Category)
-    query = select(Category).offset(skip).limit(size).where(Category.approved == True).options(
-        load_only(
-            Category.id, Category.name, Category.description, Category.approved
-        )
-    )
-    async with db as session:
-        categories = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        cats = categories.scalars().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": cats,
-            "pages": (total+size-1)//size
-        }
+async def get_approved_categories(page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    return await paginate(statements.APPROVED_CATEGORY_LISTING, page, size, db, cursor)
 
-async def get_unapproved_categories(page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Category)
-    query = select(Category).offset(skip).limit(size).where(Category.approved == False).options(
-        load_only(
-            Category.id, Category.name, Category.description, Category.approved
-        )
-    )
-    async with db as session:
-        categories = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        cats = categories.scalars().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": cats,
-            "pages": (total+size-1)//size
-        }
+async def get_unapproved_categories(page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    return await paginate(statements.UNAPPROVED_CATEGORY_LISTING, page, size, db, cursor)
 
-async def get_all_categories(page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Category)
-    query = select(Category).offset(skip).limit(size).options(
-        load_only(Category.id, Category.name, Category.description, Category.approved))
-    async with db as session:
-        categories = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        cats = categories.scalars().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": cats,
-            "pages": (total+size-1)//size
-        }
+async def get_all_categories(page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    return await paginate(statements.ALL_CATEGORY_LISTING, page, size, db, cursor)
 
 async def create_category(category: Category, db: AsyncSession):
-    async with db as session:
+    async with operation(db) as session:
         session.add(category)
         await session.flush()
-        await session.commit()
+        category_id, name, approved = category.id, category.name, category.approved
+        await commit(session)
+    after_commit(db, invalidate_counts, "categories")
+    if approved:
+        after_commit(db, suggestion_index.add, CATEGORY, category_id, name)
 
 async def get_category_by_name(name: str, db: AsyncSession):
-    query = select(Category).where(Category.name == name).options(
-        load_only(Category.id)
-    )
-    async with db as session:
-        category = await session.execute(query)
+    async with operation(db) as session:
+        category = await session.execute(statements.CATEGORY_BY_NAME, {"name": name})
         return category.scalars().one_or_none()
 
-async def search_approved_categories(query: str, page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Category)
-    query = (select(Category).offset(skip).limit(size)
-             .where((Category.approved == True) & (Category.name.like(f'%{query}%') | Category.description.like(f'%{query}%')))
-            .options(
-                load_only(
-                    Category.id, Category.name, Category.description, Category.approved
-                )))
-    async with db as session:
-        categories = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        cats = categories.scalars().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": cats,
-            "pages": (total+size-1)//size
-        }
+async def search_approved_categories(query: str, page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    stmt, rank = full_text_search(statements.APPROVED_CATEGORIES, CATEGORY_SEARCH, query, db.bind.dialect.name)
+    return await paginate(Listing(stmt, [*rank, Category.id]), page, size, db, cursor)
 
-async def search_all_categories(query: str, page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Category)
-    query = (select(Category).offset(skip).limit(size)
-             .where((Category.name.like(f'%{query}%') | Category.description.like(f'%{query}%')))
-            .options(
-                load_only(
-                    Category.id, Category.name, Category.description, Category.approved
-                )))
-    async with db as session:
-        categories = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        cats = categories.scalars().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": cats,
-            "pages": (total+size-1)//size
-        }
+async def search_all_categories(query: str, page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    stmt, rank = full_text_search(statements.CATEGORIES, CATEGORY_SEARCH, query, db.bind.dialect.name)
+    return await paginate(Listing(stmt, [*rank, Category.id]), page, size, db, cursor)
 
 async def get_category_by_id(id: int, db: AsyncSession):
-    query = (select(Category).where(Category.id == id)
-            .options(
-                load_only(
-                    Category.id, Category.name, Category.description, Category.approved
-                )))
-    async with db as session:
-        category = await session.execute(query)
+    async with operation(db) as session:
+        category = await session.execute(statements.CATEGORY_BY_ID, {"id": id})
         return category.scalars().one_or_none()
 
 async def approve_category(id: int, approved: bool, db: AsyncSession):
-    query = update(Category).where(Category.id == id).values(approved=approved)
-    async with db as session:
-        await session.execute(query)
-        await session.commit()
+    query = update(Category).where(Category.id == id).values(approved=approved, revision=Category.revision+1).returning(Category.name)
+    async with operation(db) as session:
+        name = (await session.execute(query)).scalar_one_or_none()
+        await commit(session)
+    after_commit(db, invalidate_counts, "categories")
+    if approved and name is not None:
+        after_commit(db, suggestion_index.add, CATEGORY, id, name)
+    else:
+        after_commit(db, suggestion_index.remove, CATEGORY, id)
 
 async def update_category(id: int, category: CategoryRequest, db: AsyncSession):
-    query = update(Category).where(Category.id == id).values(name=category.name, description=category.description)
-    async with db as session:
-        await session.execute(query)
-        await session.commit()
+    query = (update(Category).where(Category.id == id)
+             .values(name=category.name, description=category.description, revision=Category.revision+1)
+             .returning(Category.approved))
+    async with operation(db) as session:
+        approved = (await session.execute(query)).scalar_one_or_none()
+        # Quiz documents embed the category name.
+        await session.execute(update(Quiz.__table__).where(Quiz.category_id == id).values(revision=Quiz.revision+1))
+        await commit(session)
+    after_commit(db, invalidate_counts, "categories")
+    after_commit(db, invalidate_quizzes_where, lambda quiz: quiz["category_id"] == id)
+    if approved:
+        after_commit(db, suggestion_index.add, CATEGORY, id, category.name)
 
 async def remove_category(id: int, db: AsyncSession):
-    async with db as session:
+    async with operation(db) as session:
+        quiz_ids = (await session.execute(statements.CATEGORY_QUIZ_IDS, {"category_id": id})).scalars().all()
         await session.execute(delete(Category).where(Category.id == id))
-        await session.commit()
+        await commit(session)
+    after_commit(db, invalidate_counts, "categories", "quizzes")
+    after_commit(db, invalidate_quizzes_where, lambda quiz: quiz["category_id"] == id)
+    after_commit(db, suggestion_index.remove, CATEGORY, id)
+    after_commit(db, suggestion_index.remove_all, QUIZ, quiz_ids)
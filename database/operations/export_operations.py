@@ -0,0 +1,62 @@
+from typing import AsyncIterator
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.model.answer_model import Answer
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+
+EXPORT_BATCH_SIZE = 1000
+
+QUIZ_ROW_COLUMNS = ("quiz_id", "user_id", "category_id", "approved", "title", "description",
+                    "question_id", "question_text", "answer_id", "answer_text", "isCorrect")
+TAKEN_QUIZ_COLUMNS = ("id", "quiz_id", "user_id", "correct_answers", "total_answers")
+
+
+# These take a session of their own rather than the request's: they run while the response is being sent.
+
+async def stream_quiz_rows(user_id: int | None, db: AsyncSession) -> AsyncIterator[tuple]:
+    query = (select(Quiz.id, Quiz.user_id, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description,
+                    Question.id, Question.text, Answer.id, Answer.text, Answer.isCorrect)
+             .outerjoin(Question, Question.quiz_id == Quiz.id)
+             .outerjoin(Answer, Answer.question_id == Question.id)
+             .order_by(Quiz.id, Question.id, Answer.id)
+             .execution_options(yield_per=EXPORT_BATCH_SIZE))
+    if user_id is not None:
+        query = query.where(Quiz.user_id == user_id)
+    async with db as session:
+        result = await session.stream(query)
+        async for row in result:
+            yield tuple(row)
+
+# One document per quiz in the shape POST /quiz/import accepts; only the quiz being assembled is held in memory.
+async def stream_quiz_documents(user_id: int | None, db: AsyncSession) -> AsyncIterator[dict]:
+    quiz = question = None
+    async for (quiz_id, owner_id, category_id, approved, title, description,
+               question_id, question_text, answer_id, answer_text, is_correct) in stream_quiz_rows(user_id, db):
+        if quiz is None or quiz["id"] != quiz_id:
+            if quiz is not None:
+                yield quiz
+            quiz = {"id": quiz_id, "user_id": owner_id, "category_id": category_id, "approved": approved,
+                    "title": title, "description": description, "questions": []}
+            question = None
+        if question_id is None:
+            continue
+        if question is None or question["id"] != question_id:
+            question = {"id": question_id, "text": question_text, "answers": []}
+            quiz["questions"].append(question)
+        if answer_id is not None:
+            question["answers"].append({"id": answer_id, "text": answer_text, "isCorrect": is_correct})
+    if quiz is not None:
+        yield quiz
+
+async def stream_taken_quizzes(user_id: int | None, db: AsyncSession) -> AsyncIterator[TakenQuiz]:
+    query = select(TakenQuiz).order_by(TakenQuiz.id).execution_options(yield_per=EXPORT_BATCH_SIZE)
+    if user_id is not None:
+        query = query.where(TakenQuiz.user_id == user_id)
+    async with db as session:
+        taken_quizzes = await session.stream_scalars(query)
+        async for taken_quiz in taken_quizzes:
+            yield taken_quiz
@@ -0,0 +1,39 @@
+from typing import Iterable, NamedTuple
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database import statements
+from database.unit_of_work import operation
+
+
+class Ownership(NamedTuple):
+    quiz_id: int
+    user_id: int
+    approved: bool
+
+
+async def _resolve(query, ids: Iterable[int], db: AsyncSession) -> dict[int, Ownership]:
+    ids = set(ids)
+    if not ids:
+        return {}
+    async with operation(db) as session:
+        result = await session.execute(query, {"ids": ids})
+        return {id: Ownership(quiz_id, user_id, approved) for id, quiz_id, user_id, approved in result.all()}
+
+async def resolve_quiz_owners(ids: Iterable[int], db: AsyncSession) -> dict[int, Ownership]:
+    return await _resolve(statements.QUIZ_OWNERS, ids, db)
+
+async def resolve_question_owners(ids: Iterable[int], db: AsyncSession) -> dict[int, Ownership]:
+    return await _resolve(statements.QUESTION_OWNERS, ids, db)
+
+async def resolve_answer_owners(ids: Iterable[int], db: AsyncSession) -> dict[int, Ownership]:
+    return await _resolve(statements.ANSWER_OWNERS, ids, db)
+
+async def get_quiz_owner(id: int, db: AsyncSession) -> Ownership | None:
+    return (await resolve_quiz_owners([id], db)).get(id)
+
+async def get_question_owner(id: int, db: AsyncSession) -> Ownership | None:
+    return (await resolve_question_owners([id], db)).get(id)
+
+async def get_answer_owner(id: int, db: AsyncSession) -> Ownership | None:
+    return (await resolve_answer_owners([id], db)).get(id)
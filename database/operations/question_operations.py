@@ -1,49 +1,52 @@
-from sqlalchemy import select, update, delete
+from sqlalchemy import update, delete
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, load_only
 
+from database import statements
 from database.model.question_model import Question
-from database.model.quiz_model import Quiz
+from database.operations.ownership_operations import resolve_question_owners
+from database.operations.quiz_operations import bump_revisions
+from database.quiz_cache import invalidate_quiz
+from database.unit_of_work import operation, commit, after_commit
 from models.requests.question_request import QuestionRequest
 
 
 async def get_question_by_id(question_id: int, db: AsyncSession):
-    query = (select(Question)
-             .options(load_only(
-        Question.id, Question.quiz_id
-    )).where(Question.id == question_id))
-    async with db as session:
-        question = await session.execute(query)
+    async with operation(db) as session:
+        question = await session.execute(statements.QUESTION_BY_ID, {"id": question_id})
         return question.scalars().unique().one_or_none()
 
 async def create_question(question: Question, db: AsyncSession):
-    async with db as session:
+    async with operation(db) as session:
         session.add(question)
         await session.flush()
-        await session.commit()
+        quiz_id = question.quiz_id
+        await bump_revisions([quiz_id], session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, quiz_id)
 
 async def update_question(id: int, question: QuestionRequest, db: AsyncSession):
-    query = update(Question).where(Question.id == id).values(text=question.text)
-    async with db as session:
-        await session.execute(query)
-        await session.commit()
+    query = update(Question).where(Question.id == id).values(text=question.text).returning(Question.quiz_id)
+    async with operation(db) as session:
+        quiz_ids = (await session.execute(query)).scalars().all()
+        await bump_revisions(quiz_ids, session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, *quiz_ids)
 
 async def remove_question(id: int, db: AsyncSession):
-    async with db as session:
-        await session.execute(delete(Question).where(Question.id == id))
-        await session.commit()
+    async with operation(db) as session:
+        quiz_ids = (await session.execute(delete(Question).where(Question.id == id).returning(Question.quiz_id))).scalars().all()
+        await bump_revisions(quiz_ids, session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, *quiz_ids)
 
 async def bulk_delete_question(user_id: int, id: list[int], db: AsyncSession):
-    async with db as session:
-        subquery = (
-            select(Question.id)
-            .join(Quiz)
-            .where(
-                Question.id.in_(id),
-                Quiz.user_id == user_id
-            )
-        )
-
-        stmt = delete(Question).where(Question.id.in_(subquery))
-        await session.execute(stmt)
-        await session.commit()
\ No newline at end of file
+    owners = await resolve_question_owners(id, db)
+    owned = [question_id for question_id, owner in owners.items() if owner.user_id == user_id]
+    if not owned:
+        return
+    async with operation(db) as session:
+        await session.execute(delete(Question).where(Question.id.in_(owned)))
+        quiz_ids = {owners[question_id].quiz_id for question_id in owned}
+        await bump_revisions(quiz_ids, session)
+        await commit(session)
+    after_commit(db, invalidate_quiz, *quiz_ids)
@@ -1,208 +1,164 @@
-from sqlalchemy import select, Sequence, update, delete, func
+from typing import AsyncIterable
+
+from sqlalchemy import Sequence, update, delete, func, bindparam, insert
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import joinedload, load_only
 
+from database.counting import invalidate_counts
 from database.model.answer_model import Answer
-from database.model.category_model import Category
 from database.model.question_model import Question
 from database.model.quiz_model import Quiz
-from database.model.user_model import User
+from database import statements
+from database.pagination import paginate, Listing
+from database.quiz_cache import get_cached_quiz, cache_version, cache_quiz, quiz_document, invalidate_quiz
+from database.routing import use_primary
+from database.search import full_text_search, QUIZ_SEARCH
+from database.suggestions import suggestion_index, QUIZ
+from database.unit_of_work import operation, commit, after_commit
+from models.requests.quiz_import_request import QuestionImport
 from models.requests.quiz_request import QuizRequest
 
 
 async def get_quiz_by_id(id: int, db: AsyncSession) -> Quiz | None:
-    query = (select(Quiz).
-             options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                     joinedload(Quiz.questions).load_only(Question.id, Question.text)
-                     .joinedload(Question.answers).load_only(Answer.id, Answer.text, Answer.isCorrect),
-                     joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where(Quiz.id == id))
-    async with db as session:
-        quiz = await session.execute(query)
+    async with operation(db) as session:
+        quiz = await session.execute(statements.QUIZ_BY_ID, {"id": id})
         return quiz.scalars().unique().one_or_none()
 
-async def get_all_quizzes(page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Quiz)
-    query = (select(Quiz).offset(skip).limit(size)
-             .options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                                                          joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name)))
-    async with db as session:
-        quizzes = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        quiz = quizzes.scalars().unique().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": quiz,
-            "pages": (total+size-1)//size
-        }
-
-async def get_all_approved_quizzes(page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Quiz)
-    query = (select(Quiz).offset(skip).limit(size)
-             .options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                      joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where(Quiz.approved == True))
-    async with db as session:
-        quizzes = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        quiz = quizzes.scalars().unique().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": quiz,
-            "pages": (total+size-1)//size
-        }
-
-async def get_unapproved_quizzes(page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Quiz)
-    query = (select(Quiz).offset(skip).limit(size)
-             .options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                      joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where(Quiz.approved == False))
-    async with db as session:
-        quizzes = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        quiz = quizzes.scalars().unique().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": quiz,
-            "pages": (total+size-1)//size
-        }
+# A caller that has just read the quiz's revision passes it so a cached document from before that write is reloaded.
+async def get_quiz_document(id: int, db: AsyncSession, revision: int | None = None) -> tuple[int, dict] | None:
+    cached = get_cached_quiz(id)
+    if cached is not None and (revision is None or cached[0] == revision):
+        return cached
+    version = cache_version()
+    with use_primary():
+        quiz = await get_quiz_by_id(id, db)
+    if quiz is None:
+        return None
+    return cache_quiz(id, version, quiz.revision, quiz_document(quiz))
+
+# Read from the primary like the document itself, so a lagging replica can't confirm an outdated ETag.
+async def get_quiz_revision(id: int, db: AsyncSession):
+    with use_primary():
+        async with operation(db) as session:
+            return (await session.execute(statements.QUIZ_REVISION, {"id": id})).one_or_none()
+
+async def bump_revisions(quiz_ids, session: AsyncSession):
+    if quiz_ids:
+        await session.execute(statements.BUMP_QUIZ_REVISIONS, {"ids": sorted(quiz_ids)})
+
+async def get_all_quizzes(page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    return await paginate(statements.ALL_QUIZ_LISTING, page, size, db, cursor)
+
+async def get_all_approved_quizzes(page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    return await paginate(statements.APPROVED_QUIZ_LISTING, page, size, db, cursor)
+
+async def get_unapproved_quizzes(page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    return await paginate(statements.UNAPPROVED_QUIZ_LISTING, page, size, db, cursor)
 
 async def get_all_user_quizzes(id: int, db: AsyncSession) -> Sequence[Quiz]:
-    query = (select(Quiz).
-             options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                     joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where(Quiz.user_id == id))
-    async with db as session:
-        quizzes = await session.execute(query)
+    async with operation(db) as session:
+        quizzes = await session.execute(statements.USER_QUIZZES, {"user_id": id})
         return quizzes.scalars().unique().all()
 
-async def search_quizzes(query: str, page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Quiz)
-    query = (select(Quiz).offset(skip).limit(size).
-             options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                     joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where(Quiz.title.like(f'%{query}%')))
-    async with db as session:
-        quizzes = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        quiz = quizzes.scalars().unique().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": quiz,
-            "pages": (total+size-1)//size
-        }
-
-async def search_approved_quizzes(query: str, page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Quiz)
-    query = (select(Quiz).offset(skip).limit(size).
-             options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                     joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where((Quiz.approved == True) & Quiz.title.like(f'%{query}%')))
-    async with db as session:
-        quizzes = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        quiz = quizzes.scalars().unique().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": quiz,
-            "pages": (total+size-1)//size
-        }
-
-async def get_quizzes_by_category(id: int, page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Quiz)
-    query = (select(Quiz).offset(skip).limit(size).
-             options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                     joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where(Quiz.category_id == id))
-    async with db as session:
-        quizzes = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        quiz = quizzes.scalars().unique().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": quiz,
-            "pages": (total+size-1)//size
-        }
-
-async def get_approved_quizzes_by_category(id: int, page: int, size: int, db: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(Quiz)
-    query = (select(Quiz).offset(skip).limit(size).
-             options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                     joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where((Quiz.category_id == id) & (Quiz.approved == True)))
-    async with db as session:
-        quizzes = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        quiz = quizzes.scalars().unique().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": quiz,
-            "pages": (total+size-1)//size
-        }
+async def search_quizzes(query: str, page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    stmt, rank = full_text_search(statements.QUIZZES, QUIZ_SEARCH, query, db.bind.dialect.name)
+    return await paginate(Listing(stmt, [*rank, Quiz.id]), page, size, db, cursor)
+
+async def search_approved_quizzes(query: str, page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    stmt, rank = full_text_search(statements.APPROVED_QUIZZES, QUIZ_SEARCH, query, db.bind.dialect.name)
+    return await paginate(Listing(stmt, [*rank, Quiz.id]), page, size, db, cursor)
+
+async def get_quizzes_by_category(id: int, page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    return await paginate(statements.CATEGORY_QUIZ_LISTING, page, size, db, cursor, {"category_id": id})
+
+async def get_approved_quizzes_by_category(id: int, page: int, size: int, db: AsyncSession, cursor: str | None = None):
+    return await paginate(statements.CATEGORY_APPROVED_QUIZ_LISTING, page, size, db, cursor, {"category_id": id})
 
 async def get_all_user_approved_quizzes(id: int, db: AsyncSession) -> Sequence[Quiz]:
-    query = (select(Quiz).
-             options(load_only(Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.category_id, Quiz.approved, Quiz.title, Quiz.description),
-                     joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
-             .where((Quiz.user_id == id) & (Quiz.approved == True)))
-    async with db as session:
-        quizzes = await session.execute(query)
+    async with operation(db) as session:
+        quizzes = await session.execute(statements.USER_APPROVED_QUIZZES, {"user_id": id})
         return quizzes.scalars().unique().all()
 
 async def create_quiz(quiz: Quiz, db: AsyncSession):
-    async with db as session:
+    async with operation(db) as session:
         session.add(quiz)
         await session.flush()
-        await session.commit()
-
-async def rate_quiz(id: int, rate: int, rate_count: int, db: AsyncSession):
-    query = update(Quiz).where(Quiz.id == id).values(total_rate=Quiz.total_rate+rate, rate_count=rate_count)
-    async with db as session:
-        await session.execute(query)
-        await session.commit()
+        quiz_id, title, approved = quiz.id, quiz.title, quiz.approved
+        await commit(session)
+    after_commit(db, invalidate_counts, "quizzes")
+    if approved:
+        after_commit(db, suggestion_index.add, QUIZ, quiz_id, title)
+
+async def rate_quiz(id: int, rate: int, db: AsyncSession) -> bool:
+    query = (update(Quiz).where((Quiz.id == id) & (Quiz.approved == True))
+             .values(total_rate=Quiz.total_rate+rate, rate_count=Quiz.rate_count+1, revision=Quiz.revision+1).returning(Quiz.id))
+    async with operation(db) as session:
+        rated = (await session.execute(query)).scalar_one_or_none() is not None
+        await commit(session)
+    after_commit(db, invalidate_quiz, id)
+    return rated
+
+async def apply_ratings(ratings: dict[int, tuple[int, int]], db: AsyncSession):
+    # One executemany UPDATE for a batch of (rate sum, rate count) per quiz.
+    query = (update(Quiz.__table__).where((Quiz.id == bindparam("quiz")) & (Quiz.approved == True))
+             .values(total_rate=Quiz.total_rate+bindparam("rate_sum"), rate_count=Quiz.rate_count+bindparam("rates"),
+                     revision=Quiz.revision+1))
+    async with operation(db) as session:
+        await session.execute(query, [{"quiz": id, "rate_sum": rate_sum, "rates": rates}
+                                      for id, (rate_sum, rates) in ratings.items()])
+        await commit(session)
+    after_commit(db, invalidate_quiz, *ratings)
 
 async def approve_quiz(id: int, approved: bool, db: AsyncSession):
-    query = update(Quiz).where(Quiz.id == id).values(approved=approved)
-    async with db as session:
-        await session.execute(query)
-        await session.commit()
+    query = update(Quiz).where(Quiz.id == id).values(approved=approved, revision=Quiz.revision+1).returning(Quiz.title)
+    async with operation(db) as session:
+        title = (await session.execute(query)).scalar_one_or_none()
+        await commit(session)
+    after_commit(db, invalidate_quiz, id)
+    after_commit(db, invalidate_counts, "quizzes")
+    if approved and title is not None:
+        after_commit(db, suggestion_index.add, QUIZ, id, title)
+    else:
+        after_commit(db, suggestion_index.remove, QUIZ, id)
 
 async def update_quiz(id: int, quiz: QuizRequest, db: AsyncSession):
-    query = update(Quiz).where(Quiz.id == id).values(title=quiz.title, description=quiz.description, approved=False, category_id=quiz.category_id)
-    async with db as session:
+    query = (update(Quiz).where(Quiz.id == id)
+             .values(title=quiz.title, description=quiz.description, approved=False, category_id=quiz.category_id,
+                     revision=Quiz.revision+1))
+    async with operation(db) as session:
         await session.execute(query)
-        await session.commit()
+        await commit(session)
+    after_commit(db, invalidate_quiz, id)
+    after_commit(db, invalidate_counts, "quizzes")
+    after_commit(db, suggestion_index.remove, QUIZ, id)
 
 async def remove_quiz(id: int, db: AsyncSession):
-    async with db as session:
+    async with operation(db) as session:
         await session.execute(delete(Quiz).where(Quiz.id == id))
-        await session.commit()
\ No newline at end of file
+        await commit(session)
+    after_commit(db, invalidate_quiz, id)
+    after_commit(db, invalidate_counts, "quizzes")
+    after_commit(db, suggestion_index.remove, QUIZ, id)
+
+# Quiz, questions and answers go in as multi-row INSERT ... RETURNING statements inside one transaction;
+# a failure anywhere in the stream leaves nothing behind.
+async def import_quiz(user_id: int, quiz: QuizRequest, batches: AsyncIterable[list[QuestionImport]], db: AsyncSession) -> dict:
+    questions = answers = 0
+    async with operation(db) as session:
+        quiz_id = (await session.execute(insert(Quiz).returning(Quiz.id),
+                                         [{"user_id": user_id, **quiz.model_dump(include={"category_id", "title", "description"})}])).scalar_one()
+        async for batch in batches:
+            if not batch:
+                continue
+            question_ids = (await session.execute(
+                insert(Question).returning(Question.id, sort_by_parameter_order=True),
+                [{"quiz_id": quiz_id, "text": question.text} for question in batch]
+            )).scalars().all()
+            rows = [{"question_id": question_id, "text": answer.text, "isCorrect": answer.isCorrect}
+                    for question_id, question in zip(question_ids, batch) for answer in question.answers]
+            if rows:
+                await session.execute(insert(Answer), rows)
+            questions += len(batch)
+            answers += len(rows)
+        await commit(session)
+    after_commit(db, invalidate_counts, "quizzes")
+    return {"id": quiz_id, "questions": questions, "answers": answers}
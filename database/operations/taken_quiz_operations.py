@@ -1,25 +1,55 @@
-from sqlalchemy import Sequence, select
+from fastapi import HTTPException
+from sqlalchemy import Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import load_only, joinedload
 
+from database import statements
+from database.counting import invalidate_counts
+from database.grading import AnswerKey, build_answer_key
 from database.model.quiz_model import Quiz
 from database.model.taken_quiz_model import TakenQuiz
+from database.quiz_cache import get_cached_answer_key, cache_answer_key, cache_version
+from database.routing import use_primary
+from database.unit_of_work import operation, commit, after_commit
 
 
 async def get_taken_quizzes(id: int, db: AsyncSession):
-    query = select(TakenQuiz).where(TakenQuiz.user_id == id).options(load_only(
-        TakenQuiz.quiz_id, TakenQuiz.correct_answers, TakenQuiz.total_answers,
-    ), joinedload(
-        TakenQuiz.quiz
-    ).load_only(
-        Quiz.title, Quiz.description,
-    ))
-    async with db as session:
-        taken_quizzes = await session.execute(query)
+    async with operation(db) as session:
+        taken_quizzes = await session.execute(statements.USER_TAKEN_QUIZZES, {"user_id": id})
         return taken_quizzes.scalars().unique().all()
 
-async def create_taken_quiz(taken_quiz: TakenQuiz, db: AsyncSession):
-    async with db as session:
+# Keys are cached per worker, so an edit made through another worker is caught by checking the quiz's current
+# revision (one primary-key read) before grading with a cached key.
+async def get_answer_key(quiz_id: int, db: AsyncSession) -> AnswerKey | None:
+    key = get_cached_answer_key(quiz_id)
+    version = cache_version()
+    with use_primary():
+        async with operation(db) as session:
+            if key is not None:
+                current = (await session.execute(statements.QUIZ_REVISION, {"id": quiz_id})).one_or_none()
+                if current is None:
+                    return None
+                if current.revision == key.revision:
+                    return key
+            rows = (await session.execute(statements.ANSWER_KEY_ROWS, {"quiz_id": quiz_id})).all()
+    if not rows:
+        return None
+    return cache_answer_key(quiz_id, version, build_answer_key(rows[0][0], rows[0][1], [row[2:] for row in rows]))
+
+async def submit_taken_quiz(user_id: int, quiz_id: int, answer_ids: list[int], db: AsyncSession) -> dict:
+    key = await get_answer_key(quiz_id, db)
+    if key is None:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    if not key.approved:
+        raise HTTPException(status_code=403, detail="You are not authorized to take this quiz. Quiz not approved")
+    unknown = set(answer_ids) - key.answers.keys()
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Answers not in this quiz: {unknown}")
+    result = {"quiz_id": quiz_id, "correct_answers": key.grade(answer_ids), "total_answers": key.total}
+    taken_quiz = TakenQuiz(user_id=user_id, **result)
+    async with operation(db) as session:
         session.add(taken_quiz)
         await session.flush()
-        await session.commit()
\ No newline at end of file
+        result["id"] = taken_quiz.id
+        await commit(session)
+    after_commit(db, invalidate_counts, "takenQuizzes")
+    return result
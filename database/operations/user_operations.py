@@ -1,80 +1,80 @@
 from typing import Any, Coroutine, Sequence
 
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import update, delete, func
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy.orm import load_only
 
+from auth.principal_cache import invalidate_principal
+from database.counting import invalidate_counts
+from database.quiz_cache import invalidate_quizzes_where
+from database.model.quiz_model import Quiz
 from database.model.user_model import User
+from database import statements
+from database.pagination import paginate
+from database.suggestions import suggestion_index, QUIZ
+from database.unit_of_work import operation, commit, after_commit
 from models.requests.user_update_request import UserUpdateRequest
 from models.responses import user_profile_response
 
 
 async def get_user_by_username(username: str, session: AsyncSession) -> User | None:
-    query = select(User).where(User.username == username)
-    async with session as session:
-        user = await session.execute(query)
+    async with operation(session) as session:
+        user = await session.execute(statements.USER_BY_USERNAME, {"username": username})
         return user.scalars().one_or_none()
 
 async def register_user(user: User, session: AsyncSession):
-    async with session as session:
+    async with operation(session) as session:
         session.add(user)
         await session.flush()
-        await session.commit()
+        await commit(session)
         await session.refresh(user)
+    after_commit(session, invalidate_counts, "users")
 
 async def get_all_users(page: int, size: int, session: AsyncSession):
-    skip = (page-1)*size
-    total_query = select(func.count()).select_from(User)
-    query = select(User).offset(skip).limit(size).options(
-        load_only(
-            User.id, User.username, User.role, User.display_name, User.about
-        )
-    )
-    async with session as session:
-        users = await session.execute(query)
-        total_queries = await session.execute(total_query)
-        total = total_queries.scalars().one()
-        user = users.scalars().all()
-        return {
-            "total": total,
-            "page": page,
-            "size": size,
-            "items": user,
-            "pages": (total+size-1)//size
-        }
+    return await paginate(statements.USER_LISTING, page, size, session)
 
 async def get_user_by_id(id: int, session: AsyncSession) -> User | None:
-    query = select(User).where(User.id == id)
-    async with session as session:
-        user = await session.execute(query)
+    async with operation(session) as session:
+        user = await session.execute(statements.USER_BY_ID, {"id": id})
         return user.scalars().one_or_none()
 
 async def update_user_profile(user_id: int, user: UserUpdateRequest, session: AsyncSession):
     query = update(User).where(User.id == user_id).values(display_name=user.display_name, about=user.about)
-    async with session as session:
+    async with operation(session) as session:
         await session.execute(query)
-        await session.commit()
+        # Quiz documents embed the author's display name.
+        await session.execute(update(Quiz.__table__).where(Quiz.user_id == user_id).values(revision=Quiz.revision+1))
+        await commit(session)
+    after_commit(session, invalidate_principal, user_id)
+    after_commit(session, invalidate_quizzes_where, lambda quiz: quiz["user_id"] == user_id)
 
 async def update_user_password(user_id: int, password: str, session: AsyncSession):
     query = update(User).where(User.id == user_id).values(password=password)
-    async with session as session:
+    async with operation(session) as session:
         await session.execute(query)
-        await session.commit()
+        await commit(session)
+    after_commit(session, invalidate_principal, user_id)
 
 #use with caution
 async def promote_user(user_id, session: AsyncSession):
     query = update(User).where(User.id == user_id).values(role="admin")
-    async with session as session:
+    async with operation(session) as session:
         await session.execute(query)
-        await session.commit()
+        await commit(session)
+    after_commit(session, invalidate_principal, user_id)
 
 async def demote_user(user_id, session: AsyncSession):
     query = update(User).where(User.id == user_id).values(role="user")
-    async with session as session:
+    async with operation(session) as session:
         await session.execute(query)
-        await session.commit()
+        await commit(session)
+    after_commit(session, invalidate_principal, user_id)
 
 async def delete_user(user_id: int, session: AsyncSession):
-    async with session as session:
+    async with operation(session) as session:
+        quiz_ids = (await session.execute(statements.USER_QUIZ_IDS, {"user_id": user_id})).scalars().all()
         await session.execute(delete(User).where(User.id == user_id))
-        await session.commit()
+        await commit(session)
+    after_commit(session, invalidate_counts, "users", "quizzes")
+    after_commit(session, suggestion_index.remove_all, QUIZ, quiz_ids)
+    after_commit(session, invalidate_principal, user_id)
+    after_commit(session, invalidate_quizzes_where, lambda quiz: quiz["user_id"] == user_id)
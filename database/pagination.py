@@ -0,0 +1,144 @@
+import base64
+import binascii
+import json
+import math
+from functools import cached_property
+from typing import Any, Sequence
+
+from fastapi import HTTPException
+from sqlalchemy import Select, Integer, tuple_, func, select, bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.counting import known_count, remember_count
+from database.unit_of_work import operation
+
+
+def encode_cursor(values: list[Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+# Id keys are integer columns; rank keys are computed scores. Anything else would only fail later inside the driver.
+def _valid_position(key, value: Any) -> bool:
+    if isinstance(value, bool):
+        return False
+    if isinstance(key.type, Integer):
+        return isinstance(value, int)
+    return isinstance(value, int) or (isinstance(value, float) and math.isfinite(value))
+
+
+def decode_cursor(cursor: str, keys: Sequence) -> list[Any] | None:
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if (not isinstance(values, list) or len(values) != len(keys)
+            or not all(_valid_position(key, value) for key, value in zip(keys, values))):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def with_sort_keys(query: Select, keys: Sequence) -> Select:
+    # Sort keys ride along as extra columns so cursors also work for computed keys such as search rank.
+    return query.add_columns(*(key.label(f"sort_key_{i}") for i, key in enumerate(keys)))
+
+
+def cursor_after(rows: Sequence[Any], keys: Sequence) -> str | None:
+    if not rows:
+        return None
+    return encode_cursor([rows[-1][i + 1] for i in range(len(keys))])
+
+
+def seek(query: Select, keys: Sequence, values: list[Any]) -> Select:
+    if len(keys) == 1:
+        return query.where(keys[0] > values[0])
+    return query.where(tuple_(*keys) > tuple_(*values))
+
+
+class Listing:
+    # The page, keyset and total statements derived from a query are built on first use and then reused: filter
+    # values, offsets, limits and cursor positions are bound per call, so a module-level listing goes straight to
+    # SQLAlchemy's compiled cache instead of being rebuilt and re-keyed on every request.
+    def __init__(self, query: Select, keys: Sequence):
+        self.query = query
+        self.keys = list(keys)
+
+    @cached_property
+    def ordered(self) -> Select:
+        return with_sort_keys(self.query, self.keys).order_by(*self.keys)
+
+    @cached_property
+    def page(self) -> Select:
+        return self.ordered.offset(bindparam("offset")).limit(bindparam("limit"))
+
+    @cached_property
+    def counted_page(self) -> Select:
+        # The window count sees the filtered rows before LIMIT, so the page and its total arrive together.
+        return self.page.add_columns(func.count().over().label("total"))
+
+    @cached_property
+    def total(self) -> Select:
+        return select(func.count()).select_from(self.query.subquery())
+
+    @cached_property
+    def first(self) -> Select:
+        return self.ordered.limit(bindparam("limit"))
+
+    @cached_property
+    def after(self) -> Select:
+        positions = [bindparam(f"after_{i}") for i in range(len(self.keys))]
+        return with_sort_keys(seek(self.query, self.keys, positions), self.keys).order_by(*self.keys).limit(bindparam("limit"))
+
+
+async def keyset_paginate(listing: Listing, cursor: str, size: int, db: AsyncSession, params: dict):
+    values = decode_cursor(cursor, listing.keys)
+    # One extra row tells us whether another page exists without counting the table.
+    if values is None:
+        query, params = listing.first, {**params, "limit": size + 1}
+    else:
+        query, params = listing.after, {**params, "limit": size + 1, **{f"after_{i}": value for i, value in enumerate(values)}}
+    async with operation(db) as session:
+        result = await session.execute(query, params)
+        rows = result.all()
+    return {
+        "size": size,
+        "items": [row[0] for row in rows[:size]],
+        "next_cursor": cursor_after(rows[:size], listing.keys) if len(rows) > size else None
+    }
+
+
+async def paginate(listing: Listing, page: int, size: int, db: AsyncSession, cursor: str | None = None,
+                   params: dict | None = None):
+    params = params or {}
+    if cursor is not None:
+        return await keyset_paginate(listing, cursor, size, db, params)
+    bounds = {**params, "offset": (page-1)*size, "limit": size}
+    async with operation(db) as session:
+        known = await known_count(listing.query, session, params)
+        if known is not None:
+            total, exact = known
+            result = await session.execute(listing.page, bounds)
+            rows = result.all()
+        else:
+            result = await session.execute(listing.counted_page, bounds)
+            rows = result.all()
+            if rows:
+                total = rows[0].total
+            elif page > 1:
+                total = (await session.execute(listing.total, params)).scalar_one()
+            else:
+                total = 0
+            exact = True
+            remember_count(listing.query, total, params)
+    return {
+        "total": total,
+        "page": page,
+        "size": size,
+        "items": [row[0] for row in rows],
+        "pages": (total+size-1)//size,
+        "exact": exact,
+        "next_cursor": cursor_after(rows, listing.keys) if len(rows) == size and page*size < total else None
+    }
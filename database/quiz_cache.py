@@ -0,0 +1,100 @@
+import os
+from typing import Callable
+
+from database.grading import AnswerKey
+from database.model.quiz_model import Quiz
+from utils.lru_cache import LRUCache
+from utils.metrics import Counter, Gauge
+
+# Bounded by cached rows (quiz + questions + answers) rather than documents, since quiz sizes vary widely.
+QUIZ_CACHE_MAX_ROWS = int(os.getenv("QUIZCACHEMAXROWS", "200000"))
+QUIZ_CACHE_TTL = float(os.getenv("QUIZCACHETTL", "300"))
+ANSWER_KEY_CACHE_MAX_ROWS = int(os.getenv("ANSWERKEYCACHEMAXROWS", "1000000"))
+
+_documents = LRUCache(QUIZ_CACHE_MAX_ROWS, QUIZ_CACHE_TTL)
+_answer_keys = LRUCache(ANSWER_KEY_CACHE_MAX_ROWS, QUIZ_CACHE_TTL)
+# One counter for every invalidation keeps memory flat no matter how many distinct quizzes are written; the cost is
+# that a load overlapping any invalidation, not just one of its own quiz, goes uncached once.
+_version = 0
+
+Counter("quiz_cache_hits_total", "Quiz document cache hits.", lambda: _documents.hits)
+Counter("quiz_cache_misses_total", "Quiz document cache misses.", lambda: _documents.misses)
+Gauge("quiz_cache_entries", "Quiz documents currently cached.", lambda: len(_documents))
+Gauge("quiz_cache_rows", "Quiz, question and answer rows currently cached.", lambda: _documents.weight)
+Counter("answer_key_cache_hits_total", "Answer key cache hits.", lambda: _answer_keys.hits)
+Counter("answer_key_cache_misses_total", "Answer key cache misses.", lambda: _answer_keys.misses)
+
+
+def quiz_document(quiz: Quiz) -> dict:
+    return {
+        "id": quiz.id,
+        "user_id": quiz.user_id,
+        "total_rate": quiz.total_rate,
+        "rate_count": quiz.rate_count,
+        "average_rate": quiz.average_rate,
+        "category_id": quiz.category_id,
+        "approved": quiz.approved,
+        "title": quiz.title,
+        "description": quiz.description,
+        "category": {"id": quiz.category.id, "name": quiz.category.name},
+        "user": {"id": quiz.user.id, "display_name": quiz.user.display_name},
+        "questions": [
+            {
+                "id": question.id,
+                "text": question.text,
+                "answers": [
+                    {"id": answer.id, "text": answer.text, "isCorrect": answer.isCorrect}
+                    for answer in question.answers
+                ],
+            }
+            for question in quiz.questions
+        ],
+    }
+
+
+def cache_version() -> int:
+    return _version
+
+
+# Documents are cached as (revision, document) so the ETag travels with the body it describes.
+def get_cached_quiz(id: int) -> tuple[int, dict] | None:
+    return _documents.get(id)
+
+
+def cache_quiz(id: int, version: int, revision: int, document: dict) -> tuple[int, dict]:
+    # A load that overlapped an invalidation is served but not kept.
+    if version == _version:
+        rows = 1 + sum(1 + len(question["answers"]) for question in document["questions"])
+        _documents.set(id, (revision, document), weight=rows)
+    return revision, document
+
+
+def get_cached_answer_key(id: int) -> AnswerKey | None:
+    return _answer_keys.get(id)
+
+
+def cache_answer_key(id: int, version: int, key: AnswerKey) -> AnswerKey:
+    if version == _version:
+        _answer_keys.set(id, key, weight=1 + len(key.answers))
+    return key
+
+
+def invalidate_quiz(*ids: int):
+    global _version
+    _version += 1
+    for id in ids:
+        _documents.pop(id)
+        _answer_keys.pop(id)
+
+
+def invalidate_quizzes_where(predicate: Callable[[dict], bool]):
+    global _version
+    _version += 1
+    _documents.pop_where(lambda id, entry: predicate(entry[1]))
+
+
+def clear_quiz_cache():
+    global _version
+    _version += 1
+    _documents.clear()
+    _answer_keys.clear()
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import os
+
+from database.operations import quiz_operations
+from utils.metrics import Counter, Gauge
+
+RATING_WRITE_BEHIND = os.getenv("RATINGWRITEBEHIND", "false").lower() in ("1", "true", "yes")
+RATING_FLUSH_INTERVAL = float(os.getenv("RATINGFLUSHINTERVAL", "1"))
+
+logger = logging.getLogger(__name__)
+
+_flushed = Counter("rating_flushed_total", "Ratings written by the write-behind aggregator.")
+_flushes = Counter("rating_flush_updates_total", "Quiz rows updated by write-behind flushes.")
+
+
+class RatingAggregator:
+    # Coalesces ratings per quiz in memory and writes each quiz once per flush interval.
+    # Ratings still pending when the process dies are lost; the window is one interval.
+    def __init__(self, enabled: bool, interval: float):
+        self.enabled = enabled
+        self.interval = interval
+        self._pending: dict[int, tuple[int, int]] = {}
+        self._task: asyncio.Task | None = None
+        self._session_factory = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, quiz_id: int, rate: int):
+        rate_sum, rates = self._pending.get(quiz_id, (0, 0))
+        self._pending[quiz_id] = (rate_sum + rate, rates + 1)
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        try:
+            await quiz_operations.apply_ratings(batch, self._session_factory())
+        except Exception:
+            # Put the batch back so the next flush retries it alongside newer ratings.
+            for quiz_id, (rate_sum, rates) in batch.items():
+                pending_sum, pending_rates = self._pending.get(quiz_id, (0, 0))
+                self._pending[quiz_id] = (pending_sum + rate_sum, pending_rates + rates)
+            raise
+        _flushes.inc(len(batch))
+        _flushed.inc(sum(rates for _, rates in batch.values()))
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Failed to flush %d pending quiz ratings", len(self._pending))
+
+    def start(self, session_factory):
+        self._session_factory = session_factory
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._session_factory is not None:
+            await self.flush()
+
+
+rating_aggregator = RatingAggregator(RATING_WRITE_BEHIND, RATING_FLUSH_INTERVAL)
+
+Gauge("rating_pending_quizzes", "Quizzes with ratings waiting for the next write-behind flush.", lambda: len(rating_aggregator))
@@ -0,0 +1,64 @@
+import os
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import Select, CompoundSelect
+from sqlalchemy.orm import Session
+
+from utils.lru_cache import LRUCache
+from utils.metrics import Counter
+
+# After a write, that user's reads stay on the primary for this many seconds so they never see replica lag.
+READ_YOUR_WRITES_WINDOW = float(os.getenv("DBREADYOURWRITESWINDOW", "5"))
+READ_YOUR_WRITES_USERS = int(os.getenv("DBREADYOURWRITESUSERS", "100000"))
+
+_user: ContextVar[str | None] = ContextVar("database_user", default=None)
+_force_primary: ContextVar[bool] = ContextVar("database_force_primary", default=False)
+_recent_writers = LRUCache(READ_YOUR_WRITES_USERS, READ_YOUR_WRITES_WINDOW)
+
+_routed = Counter("db_statements_routed_total", "Statements sent to the primary or to a replica.")
+
+
+def set_user(username: str | None):
+    _user.set(username)
+
+
+def wrote_recently(username: str | None) -> bool:
+    return username is not None and _recent_writers.get(username) is not None
+
+
+# For reads that fill a process-wide cache: a lagging replica would pin stale rows there until the entry expires.
+@contextmanager
+def use_primary():
+    token = _force_primary.set(True)
+    try:
+        yield
+    finally:
+        _force_primary.reset(token)
+
+
+class RoutingSession(Session):
+    replicas: tuple = ()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.wrote = False
+
+    # Plain SELECTs go to a replica; writes, locking reads, raw SQL and everything after a write go to the primary.
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or (clause is not None and clause.is_dml):
+            self.wrote = True
+            if READ_YOUR_WRITES_WINDOW > 0 and _user.get() is not None:
+                _recent_writers.set(_user.get(), True)
+        if (not self.replicas or self.wrote or _force_primary.get() or not isinstance(clause, (Select, CompoundSelect))
+                or getattr(clause, "_for_update_arg", None) is not None or wrote_recently(_user.get())):
+            _routed.inc(target="primary")
+            return primary
+        _routed.inc(target="replica")
+        return random.choice(self.replicas)
+
+
+def routing_session(replicas: list) -> type[RoutingSession]:
+    return type("RoutingSession", (RoutingSession,), {"replicas": tuple(replicas)})
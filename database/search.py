@@ -0,0 +1,122 @@
+import re
+from dataclasses import dataclass
+
+from sqlalchemy import Select, select, func, literal_column, table, column, text, and_, or_, false
+from sqlalchemy.ext.asyncio import AsyncConnection
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    table: str
+    columns: tuple[str, ...]
+
+    @property
+    def fts_table(self) -> str:
+        return f"{self.table}_fts"
+
+
+QUIZ_SEARCH = SearchIndex("quizzes", ("title", "description"))
+CATEGORY_SEARCH = SearchIndex("categories", ("name", "description"))
+
+SEARCH_INDEXES = (QUIZ_SEARCH, CATEGORY_SEARCH)
+
+# First column (title/name) outranks the description on both backends.
+_PG_WEIGHTS = ("A", "B")
+_SQLITE_WEIGHTS = (10.0, 1.0)
+
+
+def _postgres_ddl(index: SearchIndex) -> list[str]:
+    vector = " || ".join(
+        f"setweight(to_tsvector('simple', coalesce({name}, '')), '{weight}')"
+        for name, weight in zip(index.columns, _PG_WEIGHTS)
+    )
+    return [
+        f"ALTER TABLE {index.table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+        f"GENERATED ALWAYS AS ({vector}) STORED",
+        f"CREATE INDEX IF NOT EXISTS ix_{index.table}_search_vector ON {index.table} USING GIN (search_vector)",
+    ]
+
+
+# Only writes to the indexed columns touch the FTS row; ratings, approvals and revision bumps leave it alone.
+def _sqlite_update_trigger(index: SearchIndex) -> str:
+    names = ", ".join(index.columns)
+    new_values = ", ".join(f"new.{name}" for name in index.columns)
+    old_values = ", ".join(f"old.{name}" for name in index.columns)
+    fts = index.fts_table
+    return (f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {index.table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END")
+
+
+def _sqlite_ddl(index: SearchIndex) -> list[str]:
+    names = ", ".join(index.columns)
+    new_values = ", ".join(f"new.{name}" for name in index.columns)
+    old_values = ", ".join(f"old.{name}" for name in index.columns)
+    fts = index.fts_table
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, content='{index.table}', content_rowid='id')",
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {index.table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new_values}); END",
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {index.table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.id, {old_values}); END",
+        _sqlite_update_trigger(index),
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+async def install_search_indexes(conn: AsyncConnection):
+    dialect = conn.dialect.name
+    for index in SEARCH_INDEXES:
+        if dialect == "postgresql":
+            statements = _postgres_ddl(index)
+        elif dialect == "sqlite":
+            exists = await conn.execute(
+                text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"), {"name": index.fts_table}
+            )
+            if not exists.first():
+                statements = _sqlite_ddl(index)
+            else:
+                # Databases indexed before the update trigger named its columns get the narrower trigger.
+                trigger = await conn.execute(
+                    text("SELECT sql FROM sqlite_master WHERE type = 'trigger' AND name = :name"),
+                    {"name": f"{index.fts_table}_au"}
+                )
+                update_trigger = _sqlite_update_trigger(index)
+                statements = [] if trigger.scalar_one_or_none() == update_trigger else [
+                    f"DROP TRIGGER IF EXISTS {index.fts_table}_au", update_trigger
+                ]
+        else:
+            continue
+        for statement in statements:
+            await conn.execute(text(statement))
+
+
+def search_terms(query: str) -> list[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+# Every term of the query must match as a word prefix; the returned sort keys put the best match first.
+def full_text_search(stmt: Select, index: SearchIndex, query: str, dialect: str) -> tuple[Select, list]:
+    if not query:
+        return stmt, []
+    terms = search_terms(query)
+    if not terms:
+        # A query of only punctuation has nothing to match, as LIKE '%!!!%' matched nothing before.
+        return stmt.where(false()), []
+    if dialect == "postgresql":
+        ts_query = func.to_tsquery("simple", " & ".join(f"{term}:*" for term in terms))
+        vector = literal_column(f"{index.table}.search_vector")
+        return stmt.where(vector.op("@@")(ts_query)), [-func.ts_rank(vector, ts_query)]
+    if dialect == "sqlite":
+        # bm25() is only usable while FTS5 drives the scan, so rank inside a subquery and join on rowid.
+        fts = table(index.fts_table, column("rowid"))
+        match = " ".join(f'"{term}"*' for term in terms)
+        matches = (select(fts.c.rowid, func.bm25(literal_column(index.fts_table), *_SQLITE_WEIGHTS).label("rank"))
+                   .where(literal_column(index.fts_table).op("MATCH")(match))
+                   .subquery(f"{index.fts_table}_matches"))
+        stmt = stmt.join(matches, matches.c.rowid == literal_column(f"{index.table}.id"))
+        return stmt, [matches.c.rank]
+    return stmt.where(and_(*(
+        or_(*(literal_column(f"{index.table}.{name}").contains(term) for name in index.columns))
+        for term in terms
+    ))), []
@@ -0,0 +1,81 @@
+from sqlalchemy import select, bindparam, update
+from sqlalchemy.orm import joinedload, load_only
+
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+from database.pagination import Listing
+
+# Statements shared by the listing and lookup operations. Each one is built once at import and executed with its
+# values bound per call; SQLAlchemy memoizes the cache key on a statement object, so reusing the same object
+# skips both construction and the cache-key walk on every request.
+
+QUIZ_COLUMNS = (Quiz.id, Quiz.user_id, Quiz.total_rate, Quiz.rate_count, Quiz.average_rate, Quiz.category_id,
+                Quiz.approved, Quiz.title, Quiz.description)
+CATEGORY_COLUMNS = (Category.id, Category.name, Category.description, Category.approved)
+
+QUIZZES = (select(Quiz)
+           .options(load_only(*QUIZ_COLUMNS),
+                    joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name)))
+APPROVED_QUIZZES = QUIZZES.where(Quiz.approved == True)
+
+QUIZ_BY_ID = (select(Quiz)
+              .options(load_only(*QUIZ_COLUMNS, Quiz.revision),
+                       joinedload(Quiz.questions).load_only(Question.id, Question.text)
+                       .joinedload(Question.answers).load_only(Answer.id, Answer.text, Answer.isCorrect),
+                       joinedload(Quiz.category).load_only(Category.name), joinedload(Quiz.user).load_only(User.display_name))
+              .where(Quiz.id == bindparam("id")))
+QUIZ_REVISION = select(Quiz.user_id, Quiz.approved, Quiz.revision).where(Quiz.id == bindparam("id"))
+BUMP_QUIZ_REVISIONS = (update(Quiz.__table__).where(Quiz.id.in_(bindparam("ids", expanding=True)))
+                       .values(revision=Quiz.revision + 1))
+USER_QUIZZES = QUIZZES.where(Quiz.user_id == bindparam("user_id"))
+USER_QUIZ_IDS = select(Quiz.id).where(Quiz.user_id == bindparam("user_id"))
+CATEGORY_QUIZ_IDS = select(Quiz.id).where(Quiz.category_id == bindparam("category_id"))
+USER_APPROVED_QUIZZES = APPROVED_QUIZZES.where(Quiz.user_id == bindparam("user_id"))
+
+ALL_QUIZ_LISTING = Listing(QUIZZES, [Quiz.id])
+APPROVED_QUIZ_LISTING = Listing(APPROVED_QUIZZES, [Quiz.id])
+UNAPPROVED_QUIZ_LISTING = Listing(QUIZZES.where(Quiz.approved == False), [Quiz.id])
+CATEGORY_QUIZ_LISTING = Listing(QUIZZES.where(Quiz.category_id == bindparam("category_id")), [Quiz.id])
+CATEGORY_APPROVED_QUIZ_LISTING = Listing(APPROVED_QUIZZES.where(Quiz.category_id == bindparam("category_id")), [Quiz.id])
+
+# Grading needs every answer's correctness; the outer joins keep a quiz without questions distinguishable from none.
+ANSWER_KEY_ROWS = (select(Quiz.approved, Quiz.revision, Question.id, Answer.id, Answer.isCorrect)
+                   .outerjoin(Question, Question.quiz_id == Quiz.id)
+                   .outerjoin(Answer, Answer.question_id == Question.id)
+                   .where(Quiz.id == bindparam("quiz_id")))
+
+CATEGORIES = select(Category).options(load_only(*CATEGORY_COLUMNS))
+APPROVED_CATEGORIES = CATEGORIES.where(Category.approved == True)
+CATEGORY_BY_ID = select(Category).options(load_only(*CATEGORY_COLUMNS, Category.revision)).where(Category.id == bindparam("id"))
+CATEGORY_BY_NAME = select(Category).where(Category.name == bindparam("name")).options(load_only(Category.id))
+
+ALL_CATEGORY_LISTING = Listing(CATEGORIES, [Category.id])
+APPROVED_CATEGORY_LISTING = Listing(APPROVED_CATEGORIES, [Category.id])
+UNAPPROVED_CATEGORY_LISTING = Listing(CATEGORIES.where(Category.approved == False), [Category.id])
+
+QUESTION_BY_ID = select(Question).options(load_only(Question.id, Question.quiz_id)).where(Question.id == bindparam("id"))
+ANSWER_BY_ID = select(Answer).where(Answer.id == bindparam("id")).options(load_only(Answer.id, Answer.question_id))
+
+# Ownership checks: primary-key joins reading only the three columns an authorization check needs.
+QUIZ_OWNERS = (select(Quiz.id, Quiz.id.label("quiz_id"), Quiz.user_id, Quiz.approved)
+               .where(Quiz.id.in_(bindparam("ids", expanding=True))))
+QUESTION_OWNERS = (select(Question.id, Quiz.id, Quiz.user_id, Quiz.approved)
+                   .join(Quiz, Question.quiz_id == Quiz.id)
+                   .where(Question.id.in_(bindparam("ids", expanding=True))))
+ANSWER_OWNERS = (select(Answer.id, Quiz.id, Quiz.user_id, Quiz.approved)
+                 .join(Question, Answer.question_id == Question.id)
+                 .join(Quiz, Question.quiz_id == Quiz.id)
+                 .where(Answer.id.in_(bindparam("ids", expanding=True))))
+
+USER_TAKEN_QUIZZES = (select(TakenQuiz).where(TakenQuiz.user_id == bindparam("user_id"))
+                      .options(load_only(TakenQuiz.quiz_id, TakenQuiz.correct_answers, TakenQuiz.total_answers),
+                               joinedload(TakenQuiz.quiz).load_only(Quiz.title, Quiz.description)))
+
+USER_BY_USERNAME = select(User).where(User.username == bindparam("username"))
+USER_BY_ID = select(User).where(User.id == bindparam("id"))
+USER_LISTING = Listing(select(User).options(load_only(User.id, User.username, User.role, User.display_name, User.about)),
+                       [User.id])
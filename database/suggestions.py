@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+from bisect import bisect_left, insort
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.model.category_model import Category
+from database.model.quiz_model import Quiz
+from database.routing import use_primary
+from database.unit_of_work import operation
+
+# Each worker keeps its own index and only applies its own writes, so it is rebuilt this often to pick up the
+# approvals, edits and deletions handled by other workers; 0 turns the rebuild off.
+SUGGEST_REFRESH_INTERVAL = float(os.getenv("SUGGESTREFRESHINTERVAL", "60"))
+
+logger = logging.getLogger(__name__)
+
+QUIZ = "quiz"
+CATEGORY = "category"
+
+
+def _normalize(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _word_suffixes(text: str) -> set[str]:
+    # Every word start is a key, so "intro" finds "Physics intro quiz" as well as "Intro to physics".
+    words = _normalize(text).split(" ")
+    return {" ".join(words[i:]) for i in range(len(words))}
+
+
+class PrefixIndex:
+    def __init__(self):
+        self._entries: list[tuple[str, str, int]] = []
+        self._items: dict[tuple[str, int], tuple[str, set[str]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def build(self, items: list[tuple[str, int, str]]):
+        self._items = {(kind, id): (text, _word_suffixes(text)) for kind, id, text in items}
+        self._entries = sorted(
+            (key, kind, id) for (kind, id), (_, keys) in self._items.items() for key in keys
+        )
+
+    def add(self, kind: str, id: int, text: str):
+        self.remove(kind, id)
+        keys = _word_suffixes(text)
+        self._items[(kind, id)] = (text, keys)
+        for key in keys:
+            insort(self._entries, (key, kind, id))
+
+    def remove(self, kind: str, id: int):
+        item = self._items.pop((kind, id), None)
+        if item is None:
+            return
+        for key in item[1]:
+            index = bisect_left(self._entries, (key, kind, id))
+            if index < len(self._entries) and self._entries[index] == (key, kind, id):
+                del self._entries[index]
+
+    def remove_all(self, kind: str, ids):
+        for id in ids:
+            self.remove(kind, id)
+
+    def suggest(self, prefix: str, limit: int = 10) -> list[dict]:
+        prefix = _normalize(prefix)
+        if not prefix:
+            return []
+        suggestions = []
+        seen = set()
+        index = bisect_left(self._entries, (prefix,))
+        while index < len(self._entries) and len(suggestions) < limit:
+            key, kind, id = self._entries[index]
+            if not key.startswith(prefix):
+                break
+            if (kind, id) not in seen:
+                seen.add((kind, id))
+                suggestions.append({"type": kind, "id": id, "text": self._items[(kind, id)][0]})
+            index += 1
+        return suggestions
+
+
+suggestion_index = PrefixIndex()
+
+
+async def load_suggestions(db: AsyncSession):
+    with use_primary():
+        async with operation(db) as session:
+            quizzes = await session.execute(select(Quiz.id, Quiz.title).where(Quiz.approved == True))
+            categories = await session.execute(select(Category.id, Category.name).where(Category.approved == True))
+        suggestion_index.build(
+            [(QUIZ, id, title) for id, title in quizzes.all()] +
+            [(CATEGORY, id, name) for id, name in categories.all()]
+        )
+
+
+class SuggestionRefresher:
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def _run(self, session_factory):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await load_suggestions(session_factory())
+            except Exception:
+                logger.exception("Failed to rebuild the suggestion index")
+
+    def start(self, session_factory):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run(session_factory))
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+suggestion_refresher = SuggestionRefresher(SUGGEST_REFRESH_INTERVAL)
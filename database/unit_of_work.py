@@ -0,0 +1,56 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from database.db import sessionLocal
+
+UNIT_OF_WORK = "unit_of_work"
+AFTER_COMMIT = "after_commit"
+
+
+# One session, connection and transaction for a whole request. Operations flush into it, it commits once at the
+# end, and an exception anywhere rolls back everything the request wrote.
+@asynccontextmanager
+async def unit_of_work() -> AsyncIterator[AsyncSession]:
+    async with sessionLocal() as session:
+        session.info[UNIT_OF_WORK] = True
+        try:
+            yield session
+            await session.commit()
+        except BaseException:
+            await session.rollback()
+            raise
+        for callback, args in session.info.pop(AFTER_COMMIT, []):
+            callback(*args)
+
+
+# Inside a unit of work the connection and transaction carry over to the next operation, but loaded objects are
+# detached as close() used to do: routes serialize whatever attributes an object has loaded, so an identity map
+# shared across operations would change response shapes and could hand out the password column auth loaded.
+# On plain sessions (startup, the rating aggregator, exports, benchmarks) the session is closed as before.
+@asynccontextmanager
+async def operation(db: AsyncSession) -> AsyncIterator[AsyncSession]:
+    if db.info.get(UNIT_OF_WORK):
+        try:
+            yield db
+        finally:
+            db.expunge_all()
+    else:
+        async with db as session:
+            yield session
+
+
+async def commit(session: AsyncSession):
+    if session.info.get(UNIT_OF_WORK):
+        await session.flush()
+    else:
+        await session.commit()
+
+
+# Cache and index updates must not run before the rows they describe are committed, or not at all on rollback.
+def after_commit(db: AsyncSession, callback: Callable, *args):
+    if db.info.get(UNIT_OF_WORK):
+        db.info.setdefault(AFTER_COMMIT, []).append((callback, args))
+    else:
+        callback(*args)
@@ -4,9 +4,14 @@ from fastapi import FastAPI
 from sqlalchemy import select
 
 from auth.auth import get_password_hash
-from database.db import Base, engine, sessionLocal
+from database.db import Base, engine, sessionLocal, replica_engines
 from contextlib import asynccontextmanager
 from database.dependencies import get_db
+from database.rating_aggregator import rating_aggregator
+from database.columns import install_columns
+from database.indexes import install_indexes
+from database.search import install_search_indexes
+from database.suggestions import load_suggestions, suggestion_refresher
 from database.model.user_model import User
 from database.model.answer_model import Answer
 from database.model.category_model import Category
@@ -14,14 +19,20 @@ from database.model.quiz_model import Quiz
 from database.model.question_model import Question
 from database.model.taken_quiz_model import TakenQuiz
 from models.requests.user_create import UserCreate
+from utils.compression import CompressionMiddleware
+from utils.instrumentation import RequestMetricsMiddleware, loop_lag_monitor
+from utils.query_budget import QueryBudgetMiddleware
 from routes import signup, token, user_routes, category_routes, quiz_routes, question_routes, answer_routes, \
-    taken_quiz_routes
+    taken_quiz_routes, metrics_routes, search_routes, export_routes
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        await install_columns(conn)
+        await install_indexes(conn)
+        await install_search_indexes(conn)
     async with sessionLocal() as session:
         result = await session.execute(select(User).where(User.username == "adminUser"))
         existing_user = result.scalar_one_or_none()
@@ -30,17 +41,30 @@ async def lifespan(app: FastAPI):
                 display_name="Nima Kh",
                 username=os.getenv("USERNAME"),
                 about=None,
-                password=get_password_hash(os.getenv("PASSWORD"))
+                password=await get_password_hash(os.getenv("PASSWORD"))
             )
             db_user = User(**user.model_dump())
             db_user.role = "admin"
             session.add(db_user)
             await session.flush()
             await session.commit()
+    await load_suggestions(sessionLocal())
+    suggestion_refresher.start(sessionLocal)
+    rating_aggregator.start(sessionLocal)
+    loop_lag_monitor.start()
     yield
+    await loop_lag_monitor.stop()
+    await suggestion_refresher.stop()
+    await rating_aggregator.stop()
     await engine.dispose()
+    for replica in replica_engines:
+        await replica.dispose()
 
 app = FastAPI(lifespan=lifespan)
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(QueryBudgetMiddleware)
+# Added last so it wraps compression too and times the whole response.
+app.add_middleware(RequestMetricsMiddleware)
 app.include_router(signup.router)
 app.include_router(token.router)
 app.include_router(user_routes.router)
@@ -48,4 +72,7 @@ app.include_router(category_routes.router)
 app.include_router(quiz_routes.router)
 app.include_router(question_routes.router)
 app.include_router(answer_routes.router)
-app.include_router(taken_quiz_routes.router)
\ No newline at end of file
+app.include_router(taken_quiz_routes.router)
+app.include_router(search_routes.router)
+app.include_router(export_routes.router)
+app.include_router(metrics_routes.router)
\ No newline at end of file
@@ -0,0 +1,17 @@
+from pydantic import BaseModel, Field
+
+from models.requests.quiz_request import QuizRequest
+
+
+class AnswerImport(BaseModel):
+    text: str = Field(..., max_length=150, min_length=3)
+    isCorrect: bool
+
+
+class QuestionImport(BaseModel):
+    text: str = Field(..., min_length=3, max_length=450)
+    answers: list[AnswerImport] = []
+
+
+class QuizImportRequest(QuizRequest):
+    questions: list[QuestionImport] = []
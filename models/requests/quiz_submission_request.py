@@ -0,0 +1,6 @@
+from pydantic import BaseModel, Field
+
+
+class QuizSubmissionRequest(BaseModel):
+    quiz_id: int
+    answer_ids: list[int] = Field(..., max_length=10000)
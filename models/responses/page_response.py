@@ -0,0 +1,21 @@
+from typing import Generic, Optional, TypeVar
+
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    total: int
+    page: int
+    size: int
+    items: list[T]
+    pages: int
+    exact: bool
+    next_cursor: Optional[str]
+
+
+class CursorPage(BaseModel, Generic[T]):
+    size: int
+    items: list[T]
+    next_cursor: Optional[str]
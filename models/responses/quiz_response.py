@@ -12,6 +12,7 @@ class Quiz(BaseModel):
     user_id: int
     total_rate: float
     rate_count: int
+    average_rate: float
     category_id: int
     approved: bool
     title: str
@@ -0,0 +1,27 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class QuizCategory(BaseModel):
+    id: int
+    name: str
+
+
+class QuizAuthor(BaseModel):
+    id: int
+    display_name: str
+
+
+class QuizSummary(BaseModel):
+    id: int
+    user_id: int
+    total_rate: float
+    rate_count: int
+    average_rate: float
+    category_id: int
+    approved: bool
+    title: str
+    description: str
+    category: Optional[QuizCategory]
+    user: Optional[QuizAuthor]
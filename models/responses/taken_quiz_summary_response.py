@@ -0,0 +1,17 @@
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class TakenQuizQuiz(BaseModel):
+    id: int
+    title: str
+    description: str
+
+
+class TakenQuizSummary(BaseModel):
+    id: int
+    quiz_id: int
+    correct_answers: int
+    total_answers: int
+    quiz: Optional[TakenQuizQuiz]
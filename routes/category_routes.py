@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
 from fastapi.openapi.utils import status_code_ranges
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
@@ -12,50 +12,60 @@ from database.model.category_model import Category
 from database.operations import category_operations
 from models.requests.category_request import CategoryRequest
 from models.responses import category_response
+from models.responses.page_response import Page, CursorPage
+from utils.etag import etag, matches, cache_headers, not_modified
+from utils.json_response import page_response
 
 router = APIRouter(
     prefix="/category",
     tags=["category"]
 )
 
-@router.get("")
-async def get_categories(db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
-                         size: int = Query(10, ge=1, le=100), token: str = Depends(oauth2_scheme)):
+@router.get("", response_model=Page[category_response.Category] | CursorPage[category_response.Category])
+async def get_categories(request: Request, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
+                         size: int = Query(10, ge=1, le=100), cursor: str | None = Query(None),
+                         token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     categories = None
     if user.role != "admin":
-        categories = await category_operations.get_approved_categories(page, size, db)
+        categories = await category_operations.get_approved_categories(page, size, db, cursor)
     else:
-        categories = await category_operations.get_all_categories(page, size, db)
-    return categories
+        categories = await category_operations.get_all_categories(page, size, db, cursor)
+    return page_response(request, category_response.Category, categories)
 
-@router.get("/search")
-async def search_categories(query: str, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
-                            size: int = Query(10, ge=1, le=100), token: str = Depends(oauth2_scheme)):
+@router.get("/search", response_model=Page[category_response.Category] | CursorPage[category_response.Category])
+async def search_categories(query: str, request: Request, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
+                            size: int = Query(10, ge=1, le=100), cursor: str | None = Query(None),
+                            token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     categories = None
     if user.role != "admin":
-        categories = await category_operations.search_approved_categories(query, page, size, db)
+        categories = await category_operations.search_approved_categories(query, page, size, db, cursor)
     else:
-        categories = await category_operations.search_all_categories(query, page, size, db)
-    return categories
+        categories = await category_operations.search_all_categories(query, page, size, db, cursor)
+    return page_response(request, category_response.Category, categories)
 
-@router.get("/unapproved")
-async def get_unapproved_categories(db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
-                                    size: int = Query(10, ge=1, le=100), token: str = Depends(oauth2_scheme)):
+@router.get("/unapproved", response_model=Page[category_response.Category] | CursorPage[category_response.Category])
+async def get_unapproved_categories(request: Request, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
+                                    size: int = Query(10, ge=1, le=100), cursor: str | None = Query(None),
+                                    token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="Not authorized")
-    return await category_operations.get_unapproved_categories(page, size, db)
+    return page_response(request, category_response.Category, await category_operations.get_unapproved_categories(page, size, db, cursor))
 
 @router.get("/{id}", response_model=category_response.Category)
-async def get_category(id: int, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
+async def get_category(id: int, request: Request, response: Response, db: Annotated[AsyncSession, Depends(get_db)],
+                       token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     category = await category_operations.get_category_by_id(id, db)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     if not category.approved and user.role != "admin":
         raise HTTPException(status_code=403, detail="You are not authorized to perform this action")
+    if matches(request, etag(id, category.revision)):
+        return not_modified(etag(id, category.revision))
+    cache_headers(response, etag(id, category.revision))
     return category
 
 @router.post("", status_code=status.HTTP_204_NO_CONTENT)
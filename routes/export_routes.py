@@ -0,0 +1,47 @@
+from typing import Annotated, Literal
+
+from fastapi import APIRouter, Depends, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.auth import oauth2_scheme, decode_access_token
+from database.db import sessionLocal
+from database.dependencies import get_db
+from database.operations import export_operations
+from utils.export_formats import ndjson_chunks, csv_chunks
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+router = APIRouter(
+    prefix="/export",
+    tags=["export"],
+)
+
+def export_response(chunks, name: str, format: str) -> StreamingResponse:
+    return StreamingResponse(chunks, media_type=MEDIA_TYPES[format],
+                             headers={"Content-Disposition": f'attachment; filename="{name}.{format}"'})
+
+# Admins export everything, everyone else their own quizzes. Each NDJSON line can be posted back to /quiz/import.
+@router.get("/quizzes")
+async def export_quizzes(db: Annotated[AsyncSession, Depends(get_db)], format: Literal["ndjson", "csv"] = Query("ndjson"),
+                         token: str = Depends(oauth2_scheme)):
+    user = await decode_access_token(token, db)
+    user_id = None if user.role == "admin" else user.id
+    if format == "csv":
+        chunks = csv_chunks(export_operations.QUIZ_ROW_COLUMNS, export_operations.stream_quiz_rows(user_id, sessionLocal()))
+    else:
+        chunks = ndjson_chunks(export_operations.stream_quiz_documents(user_id, sessionLocal()))
+    return export_response(chunks, "quizzes", format)
+
+@router.get("/taken_quizzes")
+async def export_taken_quizzes(db: Annotated[AsyncSession, Depends(get_db)], format: Literal["ndjson", "csv"] = Query("ndjson"),
+                               token: str = Depends(oauth2_scheme)):
+    user = await decode_access_token(token, db)
+    user_id = None if user.role == "admin" else user.id
+    rows = (tuple(getattr(taken_quiz, column) for column in export_operations.TAKEN_QUIZ_COLUMNS)
+            async for taken_quiz in export_operations.stream_taken_quizzes(user_id, sessionLocal()))
+    if format == "csv":
+        chunks = csv_chunks(export_operations.TAKEN_QUIZ_COLUMNS, rows)
+    else:
+        chunks = ndjson_chunks(dict(zip(export_operations.TAKEN_QUIZ_COLUMNS, row)) async for row in rows)
+    return export_response(chunks, "taken_quizzes", format)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from utils.metrics import render_metrics
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    return render_metrics()
@@ -8,7 +8,7 @@ from auth.auth import oauth2_scheme, decode_access_token
 from database.dependencies import get_db
 from database.model.question_model import Question
 from database.model.quiz_model import Quiz
-from database.operations import quiz_operations, question_operations
+from database.operations import ownership_operations, question_operations
 from models.requests.question_request import QuestionRequest
 
 router = APIRouter(
@@ -19,10 +19,10 @@ router = APIRouter(
 @router.post("", status_code=204)
 async def create_question(question: QuestionRequest, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
-    quiz = await quiz_operations.get_quiz_by_id(question.quiz_id, db)
-    if not quiz:
+    owner = await ownership_operations.get_quiz_owner(question.quiz_id, db)
+    if not owner:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    if quiz.user_id != user.id:
+    if owner.user_id != user.id:
         raise HTTPException(status_code=403, detail="You are not authorized")
     db_question = Question(**question.model_dump())
     await question_operations.create_question(db_question, db)
@@ -30,13 +30,10 @@ async def create_question(question: QuestionRequest, db: Annotated[AsyncSession,
 @router.put("/{id}", status_code=204)
 async def update_question(id: int, question: QuestionRequest, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
-    db_question = await question_operations.get_question_by_id(id, db)
-    if not db_question:
+    owner = await ownership_operations.get_question_owner(id, db)
+    if not owner:
         raise HTTPException(status_code=404, detail="Question not found")
-    db_quiz = await quiz_operations.get_quiz_by_id(question.quiz_id, db)
-    if not db_quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found")
-    if db_quiz.user_id != user.id:
+    if owner.user_id != user.id:
         raise HTTPException(status_code=403, detail="You are not authorized")
     await question_operations.update_question(id, question, db)
 
@@ -48,12 +45,9 @@ async def bulk_delete_questions(ids: list[int], db: Annotated[AsyncSession, Depe
 @router.delete("/{id}", status_code=204)
 async def remove_question(id: int, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
-    question = await question_operations.get_question_by_id(id, db)
-    if not question:
+    owner = await ownership_operations.get_question_owner(id, db)
+    if not owner:
         raise HTTPException(status_code=404, detail="Question not found")
-    quiz = await quiz_operations.get_quiz_by_id(question.quiz_id, db)
-    if not quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found")
-    if quiz.user_id != user.id:
+    if owner.user_id != user.id:
         raise HTTPException(status_code=403, detail="You are not authorized")
     await question_operations.remove_question(id, db)
\ No newline at end of file
@@ -1,6 +1,7 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from starlette import status
@@ -10,82 +11,112 @@ from database.dependencies import get_db
 from database.model.category_model import Category
 from database.model.quiz_model import Quiz
 from database.model.user_model import User
-from database.operations import quiz_operations, user_operations, category_operations
+from database.operations import quiz_operations, user_operations, category_operations, ownership_operations
+from database.rating_aggregator import rating_aggregator
+from models.requests.quiz_import_request import QuizImportRequest, QuestionImport
 from models.requests.quiz_request import QuizRequest
 from models.responses import quiz_response, question_response
+from models.responses.page_response import Page, CursorPage
+from models.responses.quiz_summary_response import QuizSummary
+from utils.etag import etag, matches, cache_headers, not_modified
+from utils.json_response import json_response, page_response
+from utils.ndjson import read_ndjson_lines
+
+IMPORT_BATCH_SIZE = 1000
 
 router = APIRouter(
     prefix="/quiz",
     tags=["quiz"],
 )
 
-@router.get("")
-async def get_all_quizzes(db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
-                          size: int = Query(10, ge=1, le=100), token: str = Depends(oauth2_scheme)):
+@router.get("", response_model=Page[QuizSummary] | CursorPage[QuizSummary])
+async def get_all_quizzes(request: Request, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
+                          size: int = Query(10, ge=1, le=100), cursor: str | None = Query(None),
+                          token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     quizzes = None
     if user.role == "admin":
-        quizzes = await quiz_operations.get_all_quizzes(page, size, db)
+        quizzes = await quiz_operations.get_all_quizzes(page, size, db, cursor)
     else:
-        quizzes = await quiz_operations.get_all_approved_quizzes(page, size, db)
-    return quizzes
+        quizzes = await quiz_operations.get_all_approved_quizzes(page, size, db, cursor)
+    return page_response(request, QuizSummary, quizzes)
 
-@router.get("/user")
-async def get_own_quizzes(db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
+@router.get("/user", response_model=list[QuizSummary])
+async def get_own_quizzes(request: Request, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     quizzes = await quiz_operations.get_all_user_quizzes(user.id, db)
-    return quizzes
+    return json_response(request, list[QuizSummary], quizzes)
 
-@router.get("/search")
-async def search_quizzes(query: str, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
-                         size: int = Query(10, ge=1, le=100), token: str = Depends(oauth2_scheme)):
+@router.get("/search", response_model=Page[QuizSummary] | CursorPage[QuizSummary])
+async def search_quizzes(query: str, request: Request, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
+                         size: int = Query(10, ge=1, le=100), cursor: str | None = Query(None),
+                         token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     quizzes = None
     if user.role == "admin":
-        quizzes = await quiz_operations.search_quizzes(query, page, size, db)
+        quizzes = await quiz_operations.search_quizzes(query, page, size, db, cursor)
     else:
-        quizzes = await quiz_operations.search_approved_quizzes(query, page, size, db)
-    return quizzes
+        quizzes = await quiz_operations.search_approved_quizzes(query, page, size, db, cursor)
+    return page_response(request, QuizSummary, quizzes)
 
-@router.get("/unapproved")
-async def get_unapproved_quizzes(db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
-                                 size: int = Query(10, ge=1, le=100), token: str = Depends(oauth2_scheme)):
+@router.get("/unapproved", response_model=Page[QuizSummary] | CursorPage[QuizSummary])
+async def get_unapproved_quizzes(request: Request, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
+                                 size: int = Query(10, ge=1, le=100), cursor: str | None = Query(None),
+                                 token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     if user.role != "admin":
         raise HTTPException(status_code = 403, detail="Not authorized")
-    return await quiz_operations.get_unapproved_quizzes(page, size, db)
+    return page_response(request, QuizSummary, await quiz_operations.get_unapproved_quizzes(page, size, db, cursor))
 
-@router.get("/filter")
-async def filter_quizzes(category_id: int, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
-                         size: int = Query(10, ge=1, le=100), token: str = Depends(oauth2_scheme)):
+@router.get("/filter", response_model=Page[QuizSummary] | CursorPage[QuizSummary])
+async def filter_quizzes(category_id: int, request: Request, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
+                         size: int = Query(10, ge=1, le=100), cursor: str | None = Query(None),
+                         token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     category = await category_operations.get_category_by_id(category_id, db)
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
     if user.role == "admin":
-        return await quiz_operations.get_quizzes_by_category(category_id, page, size, db)
+        quizzes = await quiz_operations.get_quizzes_by_category(category_id, page, size, db, cursor)
     else:
-        return await quiz_operations.get_approved_quizzes_by_category(category_id, page, size, db)
+        quizzes = await quiz_operations.get_approved_quizzes_by_category(category_id, page, size, db, cursor)
+    return page_response(request, QuizSummary, quizzes)
 
-@router.get("/user/{user_id}")
-async def get_user_quizzes(user_id: int, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
+@router.get("/user/{user_id}", response_model=list[QuizSummary])
+async def get_user_quizzes(user_id: int, request: Request, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     query_user = await user_operations.get_user_by_id(user_id, db)
     if not query_user:
         raise HTTPException(status_code=404, detail="User not found")
     if user.role == "admin":
-        return await quiz_operations.get_all_user_quizzes(user_id, db)
+        quizzes = await quiz_operations.get_all_user_quizzes(user_id, db)
     else:
-        return await quiz_operations.get_all_user_approved_quizzes(user_id, db)
+        quizzes = await quiz_operations.get_all_user_approved_quizzes(user_id, db)
+    return json_response(request, list[QuizSummary], quizzes)
+
+def check_can_view(user: User, owner_id: int, approved: bool):
+    if (approved == False and user.role != "admin") or (owner_id != user.id and approved == False):
+        raise HTTPException(status_code=403, detail="You are not authorized to view this quiz.")
 
 @router.get("/{id}")
-async def get_quiz(id: int, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
+async def get_quiz(id: int, request: Request, response: Response, db: Annotated[AsyncSession, Depends(get_db)],
+                   token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
-    quiz = await quiz_operations.get_quiz_by_id(id, db)
-    if not quiz:
+    # The quiz row's revision is read on every request: it answers a revalidation on its own, and it tells whether
+    # this worker's cached document missed a write handled by another worker. The question and answer tree is only
+    # loaded when the revision moved.
+    current = await quiz_operations.get_quiz_revision(id, db)
+    if not current:
         raise HTTPException(status_code=404, detail="Quiz not found")
-    if (quiz.approved == False and user.role != "admin") or (quiz.user_id != user.id and quiz.approved == False):
-        raise HTTPException(status_code=403, detail="You are not authorized to view this quiz.")
+    check_can_view(user, current.user_id, current.approved)
+    if matches(request, etag(id, current.revision)):
+        return not_modified(etag(id, current.revision))
+    found = await quiz_operations.get_quiz_document(id, db, current.revision)
+    if not found:
+        raise HTTPException(status_code=404, detail="Quiz not found")
+    revision, quiz = found
+    check_can_view(user, quiz["user_id"], quiz["approved"])
+    cache_headers(response, etag(id, revision))
     return quiz
 
 @router.post("", status_code=status.HTTP_204_NO_CONTENT)
@@ -98,23 +129,71 @@ async def create_quiz(quiz: QuizRequest, db: Annotated[AsyncSession, Depends(get
     db_quiz.user_id = user.id
     await quiz_operations.create_quiz(db_quiz, db)
 
+@router.post("/import", status_code=status.HTTP_201_CREATED)
+async def import_quiz(quiz: QuizImportRequest, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
+    user = await decode_access_token(token, db)
+    category_exists = await category_operations.get_category_by_id(quiz.category_id, db)
+    if not category_exists:
+        raise HTTPException(status_code=404, detail="Category does not exist.")
+
+    async def batches():
+        for start in range(0, len(quiz.questions), IMPORT_BATCH_SIZE):
+            yield quiz.questions[start:start + IMPORT_BATCH_SIZE]
+
+    return await quiz_operations.import_quiz(user.id, quiz, batches(), db)
+
+# First line is the quiz (category_id, title, description), every following line is one question with its answers.
+@router.post("/import/ndjson", status_code=status.HTTP_201_CREATED)
+async def import_quiz_ndjson(request: Request, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
+    user = await decode_access_token(token, db)
+    lines = read_ndjson_lines(request.stream())
+    try:
+        number, line = await anext(lines)
+        quiz = QuizRequest.model_validate_json(line)
+    except StopAsyncIteration:
+        raise HTTPException(status_code=422, detail="Empty import")
+    except ValidationError as err:
+        raise HTTPException(status_code=422, detail={"line": number, "errors": err.errors(include_url=False, include_context=False)})
+    category_exists = await category_operations.get_category_by_id(quiz.category_id, db)
+    if not category_exists:
+        raise HTTPException(status_code=404, detail="Category does not exist.")
+
+    async def batches():
+        batch = []
+        async for number, line in lines:
+            try:
+                batch.append(QuestionImport.model_validate_json(line))
+            except ValidationError as err:
+                raise HTTPException(status_code=422, detail={"line": number, "errors": err.errors(include_url=False, include_context=False)})
+            if len(batch) == IMPORT_BATCH_SIZE:
+                yield batch
+                batch = []
+        yield batch
+
+    return await quiz_operations.import_quiz(user.id, quiz, batches(), db)
+
 @router.put("/rate/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def rate_quiz(id: int, rate: int, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
-    quiz = await quiz_operations.get_quiz_by_id(id, db)
-    if not quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found.")
-    if not quiz.approved:
+    if rating_aggregator.enabled:
+        owner = await ownership_operations.get_quiz_owner(id, db)
+        rated = owner is not None and owner.approved
+        if rated:
+            rating_aggregator.add(id, rate)
+    else:
+        rated = await quiz_operations.rate_quiz(id, rate, db)
+    if not rated:
+        if not await ownership_operations.get_quiz_owner(id, db):
+            raise HTTPException(status_code=404, detail="Quiz not found.")
         raise HTTPException(status_code=400, detail="Can't rate quiz that is not approved")
-    await quiz_operations.rate_quiz(id, rate, quiz.rate_count+1, db)
 
 @router.put("/approve/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def approve_quiz(id: int, approved: bool, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     if user.role != "admin":
         raise HTTPException(status_code=403, detail="You are not authorized to view this quiz.")
-    quiz = await quiz_operations.get_quiz_by_id(id, db)
-    if not quiz:
+    owner = await ownership_operations.get_quiz_owner(id, db)
+    if not owner:
         raise HTTPException(status_code=404, detail="Quiz not found.")
     await quiz_operations.approve_quiz(id, approved, db)
 
@@ -124,19 +203,19 @@ async def update_quiz(id: int, quiz: QuizRequest, db: Annotated[AsyncSession, De
     category_exists = await category_operations.get_category_by_id(quiz.category_id, db)
     if not category_exists:
         raise HTTPException(status_code=404, detail="Category does not exist.")
-    db_quiz = await quiz_operations.get_quiz_by_id(id, db)
-    if not db_quiz:
+    owner = await ownership_operations.get_quiz_owner(id, db)
+    if not owner:
         raise HTTPException(status_code=404, detail="Quiz not found.")
-    if db_quiz.user_id != user.id:
+    if owner.user_id != user.id:
         raise HTTPException(status_code=403, detail="You are not authorized to view this quiz.")
     await quiz_operations.update_quiz(id, quiz, db)
 
 @router.delete("/{id}", status_code=status.HTTP_204_NO_CONTENT)
 async def remove_quiz(id: int, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
-    quiz = await quiz_operations.get_quiz_by_id(id, db)
-    if not quiz:
+    owner = await ownership_operations.get_quiz_owner(id, db)
+    if not owner:
         raise HTTPException(status_code=404, detail="Quiz not found.")
-    if quiz.user_id != user.id:
+    if owner.user_id != user.id:
         raise HTTPException(status_code=403, detail="You are not authorized to view this quiz.")
     await quiz_operations.remove_quiz(id, db)
\ No newline at end of file
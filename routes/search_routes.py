@@ -0,0 +1,19 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from auth.auth import oauth2_scheme, decode_access_token
+from database.dependencies import get_db
+from database.suggestions import suggestion_index
+
+router = APIRouter(
+    prefix="/search",
+    tags=["search"],
+)
+
+@router.get("/suggest")
+async def suggest(prefix: str, db: Annotated[AsyncSession, Depends(get_db)], limit: int = Query(10, ge=1, le=50),
+                  token: str = Depends(oauth2_scheme)):
+    await decode_access_token(token, db)
+    return suggestion_index.suggest(prefix, limit)
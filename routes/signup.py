@@ -9,6 +9,7 @@ from auth.auth import get_password_hash, ACCESS_TOKEN_EXPIRE_MINUTES, create_acc
 from database.dependencies import get_db
 from database.model.user_model import User
 from database.operations import user_operations
+from database.routing import set_user
 from database.operations.user_operations import get_user_by_username
 from models.requests.user_create import UserCreate
 
@@ -18,10 +19,11 @@ router = APIRouter(
 
 @router.post("/register")
 async def register_user(user: UserCreate, db: Annotated[AsyncSession, Depends(get_db)]):
+    set_user(user.username)
     existing_user = await user_operations.get_user_by_username(user.username, db)
     if existing_user:
         raise HTTPException(status_code=400, detail="Username already exists")
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     new_user = User(
         **user.model_dump()
     )
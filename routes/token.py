@@ -9,6 +9,7 @@ from auth.auth import verify_password, ACCESS_TOKEN_EXPIRE_MINUTES, create_acces
 from database.dependencies import get_db
 from database.model.user_model import User
 from database.operations import user_operations
+from database.routing import set_user
 from models.requests.login_request import LoginRequest
 
 router = APIRouter(
@@ -17,8 +18,9 @@ router = APIRouter(
 
 @router.post("/token")
 async def login_for_access_token(form_data: LoginRequest, db: Annotated[AsyncSession, Depends(get_db)]):
+    set_user(form_data.username)
     user = await user_operations.get_user_by_username(form_data.username, db)
-    if not user or not verify_password(form_data.password, user.password):
+    if not user or not await verify_password(form_data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     # Create access token
@@ -1,6 +1,6 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
@@ -10,7 +10,9 @@ from database.model.user_model import User
 from database.operations import user_operations
 from models.requests.password_update_request import PasswordUpdateRequest
 from models.requests.user_update_request import UserUpdateRequest
+from models.responses.page_response import Page
 from models.responses.user_profile_response import UserProfile
+from utils.json_response import page_response
 
 router = APIRouter(
     prefix="/user",
@@ -22,12 +24,12 @@ async def get_user_profile(db: Annotated[AsyncSession, Depends(get_db)], token:
     user = await decode_access_token(token, db)
     return user
 
-@router.get("/users")
-async def get_all_users(db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
+@router.get("/users", response_model=Page[UserProfile])
+async def get_all_users(request: Request, db: Annotated[AsyncSession, Depends(get_db)], page: int = Query(1, ge=1),
                         size: int = Query(10, ge=1, le=100), token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
     users = await user_operations.get_all_users(page, size, db)
-    return users
+    return page_response(request, UserProfile, users)
 
 @router.get("/users/{user_id}", response_model=UserProfile)
 async def get_user_by_id(user_id: int, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
@@ -45,11 +47,11 @@ async def edit_user_profile(user_update: UserUpdateRequest, db: Annotated[AsyncS
 @router.put("/change_password", status_code=204)
 async def change_password(password: PasswordUpdateRequest, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
     user = await decode_access_token(token, db)
-    if not verify_password(password.current_password, user.password):
+    if not await verify_password(password.current_password, user.password):
         raise HTTPException(status_code=400, detail="Incorrect password")
-    if verify_password(password.new_password, user.password):
+    if await verify_password(password.new_password, user.password):
         raise HTTPException(status_code=400, detail="use a different password")
-    await user_operations.update_user_password(user.id, get_password_hash(password.new_password), db)
+    await user_operations.update_user_password(user.id, await get_password_hash(password.new_password), db)
 
 @router.put("/promote/{id}", status_code=204)
 async def promote_user(id: int, db: Annotated[AsyncSession, Depends(get_db)], token: str = Depends(oauth2_scheme)):
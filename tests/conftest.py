@@ -0,0 +1,43 @@
+import asyncio
+import os
+import tempfile
+
+import pytest
+
+# The app reads its settings when it is imported, so they are fixed here before any test module imports it.
+# TESTDATABASEURL runs the suite against another database, e.g. PostgreSQL; the tests empty its tables.
+TEST_DIR = tempfile.mkdtemp(prefix="up-quizz-tests-")
+os.environ["DATABASEURL"] = os.getenv("TESTDATABASEURL", f"sqlite+aiosqlite:///{TEST_DIR}/app.db")
+os.environ.pop("DBREPLICAURLS", None)
+os.environ["DBPROFILE"] = "benchmark"
+os.environ["SECRETKEY"] = "test-secret-key-test-secret-key-test-secret-key"
+os.environ["ALGORITHM"] = "HS256"
+os.environ["USERNAME"] = "adminUser"
+os.environ["PASSWORD"] = "Admin@123"
+os.environ["SUGGESTREFRESHINTERVAL"] = "0"
+os.environ["SLOWQUERYSECONDS"] = "0"
+
+from database.db import engine
+from utils.query_budget import enforce_query_budgets
+
+
+def _run(coroutine):
+    async def main():
+        try:
+            return await coroutine
+        finally:
+            await engine.dispose()
+    return asyncio.run(main())
+
+
+# Each call gets its own event loop; the pool is emptied before the loop closes, as asyncpg connections can't outlive it.
+@pytest.fixture(scope="session")
+def run():
+    return _run
+
+
+# Every request made while this is active is checked against its route's budget; violations land in the yielded list.
+@pytest.fixture
+def query_budgets():
+    with enforce_query_budgets() as recorded:
+        yield recorded
@@ -0,0 +1,165 @@
+import json
+
+import httpx
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+from starlette.routing import Match
+
+from auth.principal_cache import clear_principals
+from database.db import Base, engine
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+from database.quiz_cache import clear_quiz_cache
+from main import app
+from utils.query_budget import QueryBudgetExceeded
+
+PASSWORD = "Secret@123"
+
+
+async def empty_tables():
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        for model in (Answer, Question, TakenQuiz, Quiz, Category, User):
+            await conn.execute(delete(model))
+
+
+# Raises as soon as a request goes over its budget, naming the route, and remembers which routes it has called.
+class BudgetClient(TestClient):
+    def __init__(self, recorded: list[str]):
+        super().__init__(app)
+        self.recorded = recorded
+        self.called = set()
+
+    def request(self, method, url, *args, **kwargs):
+        # Budgets are for the worst case, so every request starts with the user and quiz caches cold.
+        clear_principals()
+        clear_quiz_cache()
+        response = super().request(method, url, *args, **kwargs)
+        assert response.status_code < 400, f"{method} {url}: {response.status_code} {response.text}"
+        scope = {"type": "http", "method": method.upper(), "path": httpx.URL(url).path}
+        self.called.update((method.upper(), route.path) for route in app.routes
+                           if isinstance(route, APIRoute) and route.matches(scope)[0] == Match.FULL)
+        if self.recorded:
+            problems = "; ".join(self.recorded)
+            self.recorded.clear()
+            raise QueryBudgetExceeded(problems)
+        return response
+
+
+def login(client: BudgetClient, username: str, password: str) -> dict:
+    token = client.post("/token", json={"username": username, "password": password}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def register(client: BudgetClient, username: str) -> dict:
+    token = client.post("/register", json={"display_name": username.title(), "username": username,
+                                           "password": PASSWORD}).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def questions_of(client: BudgetClient, quiz_id: int, headers: dict) -> list[dict]:
+    return client.get(f"/quiz/{quiz_id}", headers=headers).json()["questions"]
+
+
+# Walks every route once as an author (alice), a quiz taker (bob) and the admin.
+def exercise(client: BudgetClient):
+    admin = login(client, "adminUser", "Admin@123")
+    alice = register(client, "alice")
+    bob = register(client, "bob")
+    alice_id = client.get("/user", headers=alice).json()["id"]
+    bob_id = client.get("/user", headers=bob).json()["id"]
+    client.get("/user/users", headers=alice)
+    client.get(f"/user/users/{bob_id}", headers=alice)
+    client.put("/user", headers=alice, json={"display_name": "Alice A", "about": "Writes physics quizzes."})
+    client.put("/user/change_password", headers=alice, json={"current_password": PASSWORD, "new_password": "Secret@456"})
+    client.put(f"/user/promote/{bob_id}", headers=admin)
+    client.put(f"/user/demote/{bob_id}", headers=admin)
+
+    client.post("/category", headers=alice, json={"name": "Physics", "description": "Forces and fields"})
+    client.post("/category", headers=alice, json={"name": "Chemistry", "description": "Elements and bonds"})
+    categories = {category["name"]: category["id"]
+                  for category in client.get("/category/unapproved", headers=admin).json()["items"]}
+    physics, chemistry = categories["Physics"], categories["Chemistry"]
+    for id in (physics, chemistry):
+        client.put(f"/category/approve/{id}", headers=admin, params={"approved": True})
+    client.get("/category", headers=alice)
+    client.get("/category/search", headers=alice, params={"query": "phys"})
+    client.get(f"/category/{physics}", headers=alice)
+
+    client.post("/quiz", headers=alice, json={"category_id": physics, "title": "Mechanics", "description": "Newton's laws"})
+    quiz_id = client.get("/quiz/user", headers=alice).json()[0]["id"]
+    # Only an approved quiz can be read back, by its author included.
+    client.put(f"/quiz/approve/{quiz_id}", headers=admin, params={"approved": True})
+    for text in ("What is force?", "What is mass?"):
+        client.post("/question", headers=alice, json={"quiz_id": quiz_id, "text": text})
+    first, second = [question["id"] for question in questions_of(client, quiz_id, alice)]
+    client.post("/answer", headers=alice, json={"question_id": first, "text": "Mass times acceleration", "isCorrect": True})
+    client.post("/answer/bulk", headers=alice, json=[
+        {"question_id": question, "text": f"Answer {i}", "isCorrect": question == second and i == 0}
+        for question in (first, second) for i in range(4)
+    ])
+    questions = questions_of(client, quiz_id, alice)
+    answers = [answer["id"] for question in questions for answer in question["answers"]]
+    client.put(f"/answer/{answers[1]}", headers=alice, json={"question_id": first, "text": "Energy", "isCorrect": False})
+    client.put(f"/question/{first}", headers=alice, json={"quiz_id": quiz_id, "text": "Define force."})
+    client.put(f"/quiz/{quiz_id}", headers=alice, json={"category_id": physics, "title": "Mechanics",
+                                                       "description": "Newton's three laws"})
+    # An edited quiz goes back to the review queue.
+    client.get("/quiz/unapproved", headers=admin)
+    client.put(f"/quiz/approve/{quiz_id}", headers=admin, params={"approved": True})
+    response = client.get(f"/quiz/{quiz_id}", headers=bob)
+    client.get(f"/quiz/{quiz_id}", headers={**bob, "If-None-Match": response.headers["ETag"]})
+    client.get("/quiz", headers=bob)
+    client.get("/quiz/search", headers=bob, params={"query": "mechanics"})
+    client.get("/quiz/filter", headers=bob, params={"category_id": physics})
+    client.get(f"/quiz/user/{alice_id}", headers=bob)
+    client.put(f"/quiz/rate/{quiz_id}", headers=bob, params={"rate": 4})
+
+    imported = [{"text": f"Element {i}?", "answers": [{"text": f"Choice {j}", "isCorrect": j == 0} for j in range(4)]}
+                for i in range(5)]
+    imported_id = client.post("/quiz/import", headers=alice, json={
+        "category_id": chemistry, "title": "Elements", "description": "The periodic table", "questions": imported
+    }).json()["id"]
+    client.put(f"/quiz/approve/{imported_id}", headers=admin, params={"approved": True})
+    lines = [{"category_id": chemistry, "title": "Bonds", "description": "Covalent and ionic"}, *imported]
+    client.post("/quiz/import/ndjson", headers=alice, content="\n".join(json.dumps(line) for line in lines))
+
+    correct = [answer["id"] for question in questions for answer in question["answers"] if answer["isCorrect"]]
+    client.post("/taken_quiz/submit", headers=bob, json={"quiz_id": quiz_id, "answer_ids": correct})
+    client.get("/taken_quiz", headers=bob)
+    client.get(f"/taken_quiz/user/{bob_id}", headers=alice)
+    client.get("/search/suggest", headers=bob, params={"prefix": "mech"})
+    for headers in (admin, alice):
+        for format in ("ndjson", "csv"):
+            client.get("/export/quizzes", headers=headers, params={"format": format})
+            client.get("/export/taken_quizzes", headers=headers, params={"format": format})
+    client.get("/metrics")
+
+    client.put(f"/category/{physics}", headers=admin, json={"name": "Classical physics", "description": "Forces and fields"})
+    # The foreign keys don't cascade and Postgres enforces them, so what gets deleted has nothing under it.
+    client.delete(f"/answer/{answers[1]}", headers=alice)
+    client.request("DELETE", "/answer/bulk", headers=alice, json=[answer["id"] for answer in questions[1]["answers"]])
+    client.delete(f"/question/{second}", headers=alice)
+    client.post("/question", headers=alice, json={"quiz_id": quiz_id, "text": "What is weight?"})
+    client.request("DELETE", "/question/bulk", headers=alice, json=[questions_of(client, quiz_id, alice)[-1]["id"]])
+    client.post("/quiz", headers=alice, json={"category_id": chemistry, "title": "Draft", "description": "Not written yet"})
+    draft = next(quiz["id"] for quiz in client.get("/quiz/user", headers=alice).json() if quiz["title"] == "Draft")
+    client.delete(f"/quiz/{draft}", headers=alice)
+    client.post("/category", headers=alice, json={"name": "Biology", "description": "Cells and organisms"})
+    biology = client.get("/category/unapproved", headers=admin).json()["items"][0]["id"]
+    client.delete(f"/category/{biology}", headers=admin)
+    client.delete("/user", headers=register(client, "carol"))
+
+
+def test_every_route_stays_within_its_budget(run, query_budgets):
+    run(empty_tables())
+    with BudgetClient(query_budgets) as client:
+        exercise(client)
+    routes = {(method, route.path) for route in app.routes if isinstance(route, APIRoute) and route.include_in_schema
+              for method in route.methods}
+    assert routes - client.called == set()
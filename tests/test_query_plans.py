@@ -0,0 +1,266 @@
+import json
+import random
+import re
+
+import pytest
+from sqlalchemy import event, insert, delete, text
+
+from database.db import Base, engine, sessionLocal
+from database.indexes import install_indexes
+from database.model.answer_model import Answer
+from database.model.category_model import Category
+from database.model.question_model import Question
+from database.model.quiz_model import Quiz
+from database.model.taken_quiz_model import TakenQuiz
+from database.model.user_model import User
+from database.operations import (quiz_operations, category_operations, question_operations, answer_operations,
+                                 user_operations, taken_quiz_operations, ownership_operations, export_operations)
+from database.pagination import encode_cursor
+from database.search import install_search_indexes
+from database.suggestions import load_suggestions
+from models.requests.answer_request import AnswerRequest
+from models.requests.category_request import CategoryRequest
+from models.requests.quiz_request import QuizRequest
+from models.requests.user_update_request import UserUpdateRequest
+
+QUIZZES = 2000
+
+# Index names that differ per backend; everything else is an index declared on the models.
+PRIMARY_KEY = "primary key"
+UNIQUE = "unique constraint"
+FULL_TEXT = "full-text index"
+# Both lead with approved, and the planners pick either for a filter on approved alone.
+APPROVED = ("ix_quizzes_approved_id", "ix_quizzes_approved_category_id_id")
+
+
+async def seed(rng: random.Random) -> dict:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await install_indexes(conn)
+        await install_search_indexes(conn)
+        for model in (Answer, Question, TakenQuiz, Quiz, Category, User):
+            await conn.execute(delete(model))
+        users = (await conn.execute(insert(User).returning(User.id, sort_by_parameter_order=True), [
+            {"display_name": f"User {i}", "username": f"user{i}", "password": "x", "role": "user"} for i in range(20)
+        ])).scalars().all()
+        categories = (await conn.execute(insert(Category).returning(Category.id, sort_by_parameter_order=True), [
+            {"name": f"Category {i}", "description": "seeded category", "approved": i % 3 != 0} for i in range(30)
+        ])).scalars().all()
+        quizzes = (await conn.execute(insert(Quiz).returning(Quiz.id, sort_by_parameter_order=True), [
+            {"user_id": rng.choice(users), "category_id": rng.choice(categories), "approved": rng.random() < 0.8,
+             "title": f"Seeded quiz {i} physics", "description": "seeded description", "total_rate": 0.0, "rate_count": 0}
+            for i in range(QUIZZES)
+        ])).scalars().all()
+        questions = (await conn.execute(insert(Question).returning(Question.id, sort_by_parameter_order=True), [
+            {"quiz_id": quiz_id, "text": f"Question {i}"} for quiz_id in quizzes for i in range(3)
+        ])).scalars().all()
+        await conn.execute(insert(Answer), [
+            {"question_id": question_id, "text": f"Answer {i}", "isCorrect": i == 0} for question_id in questions for i in range(4)
+        ])
+        await conn.execute(insert(TakenQuiz), [
+            {"quiz_id": rng.choice(quizzes), "user_id": rng.choice(users), "correct_answers": 1, "total_answers": 3}
+            for _ in range(QUIZZES)
+        ])
+        answer_id = (await conn.execute(text("SELECT min(id) FROM answers"))).scalar_one()
+    async with engine.connect() as conn:
+        await conn.execute(text("ANALYZE"))
+        await conn.commit()
+    return {"user_id": users[3], "category_id": categories[4], "quiz_id": quizzes[len(quizzes) // 2],
+            "question_id": questions[len(questions) // 2], "answer_id": answer_id}
+
+
+async def drain(stream):
+    async for _ in stream:
+        pass
+
+
+# (operation, the index each table must be read through or a tuple of acceptable ones, tables it may scan). An exact total over a whole table reads
+# every row whichever index exists; COUNTMODE=cached/estimated is the fix there.
+HOT_QUERIES = [
+    pytest.param(lambda db, ids: quiz_operations.get_quiz_by_id(ids["quiz_id"], db),
+                 {"quizzes": PRIMARY_KEY, "questions": "ix_questions_quiz_id_id", "answers": "ix_answers_question_id_id"},
+                 (), id="get_quiz_by_id"),
+    pytest.param(lambda db, ids: quiz_operations.get_quiz_revision(ids["quiz_id"], db),
+                 {"quizzes": PRIMARY_KEY}, (), id="get_quiz_revision"),
+    pytest.param(lambda db, ids: quiz_operations.get_all_quizzes(3, 10, db),
+                 {}, ("quizzes",), id="get_all_quizzes"),
+    pytest.param(lambda db, ids: quiz_operations.get_all_quizzes(1, 10, db, encode_cursor([ids["quiz_id"]])),
+                 {"quizzes": PRIMARY_KEY}, (), id="get_all_quizzes cursor"),
+    pytest.param(lambda db, ids: quiz_operations.get_all_approved_quizzes(3, 10, db),
+                 {"quizzes": APPROVED}, (), id="get_all_approved_quizzes"),
+    pytest.param(lambda db, ids: quiz_operations.get_all_approved_quizzes(1, 10, db, encode_cursor([ids["quiz_id"]])),
+                 {"quizzes": APPROVED}, (), id="get_all_approved_quizzes cursor"),
+    pytest.param(lambda db, ids: quiz_operations.get_unapproved_quizzes(1, 10, db),
+                 {"quizzes": APPROVED}, (), id="get_unapproved_quizzes"),
+    pytest.param(lambda db, ids: quiz_operations.get_all_user_quizzes(ids["user_id"], db),
+                 {"quizzes": "ix_quizzes_user_id_approved_id"}, (), id="get_all_user_quizzes"),
+    pytest.param(lambda db, ids: quiz_operations.get_all_user_approved_quizzes(ids["user_id"], db),
+                 {"quizzes": "ix_quizzes_user_id_approved_id"}, (), id="get_all_user_approved_quizzes"),
+    pytest.param(lambda db, ids: quiz_operations.get_quizzes_by_category(ids["category_id"], 1, 10, db),
+                 {"quizzes": "ix_quizzes_category_id_id"}, (), id="get_quizzes_by_category"),
+    pytest.param(lambda db, ids: quiz_operations.get_approved_quizzes_by_category(ids["category_id"], 1, 10, db),
+                 {"quizzes": "ix_quizzes_approved_category_id_id"}, (), id="get_approved_quizzes_by_category"),
+    pytest.param(lambda db, ids: quiz_operations.search_quizzes("physics 12", 1, 10, db),
+                 {"quizzes": FULL_TEXT}, (), id="search_quizzes"),
+    pytest.param(lambda db, ids: quiz_operations.search_approved_quizzes("physics 12", 1, 10, db),
+                 {"quizzes": FULL_TEXT}, (), id="search_approved_quizzes"),
+    pytest.param(lambda db, ids: category_operations.get_approved_categories(1, 10, db),
+                 {"categories": "ix_categories_approved_id"}, (), id="get_approved_categories"),
+    pytest.param(lambda db, ids: category_operations.get_unapproved_categories(1, 10, db),
+                 {"categories": "ix_categories_approved_id"}, (), id="get_unapproved_categories"),
+    pytest.param(lambda db, ids: category_operations.get_all_categories(1, 10, db),
+                 {}, ("categories",), id="get_all_categories"),
+    pytest.param(lambda db, ids: category_operations.get_category_by_id(ids["category_id"], db),
+                 {"categories": PRIMARY_KEY}, (), id="get_category_by_id"),
+    pytest.param(lambda db, ids: category_operations.get_category_by_name("Category 7", db),
+                 {"categories": UNIQUE}, (), id="get_category_by_name"),
+    pytest.param(lambda db, ids: category_operations.search_approved_categories("category", 1, 10, db),
+                 {"categories": FULL_TEXT}, (), id="search_approved_categories"),
+    pytest.param(lambda db, ids: question_operations.get_question_by_id(ids["question_id"], db),
+                 {"questions": PRIMARY_KEY}, (), id="get_question_by_id"),
+    pytest.param(lambda db, ids: answer_operations.get_answer_by_id(ids["answer_id"], db),
+                 {"answers": PRIMARY_KEY}, (), id="get_answer_by_id"),
+    pytest.param(lambda db, ids: ownership_operations.resolve_quiz_owners([ids["quiz_id"], ids["quiz_id"] + 1], db),
+                 {"quizzes": PRIMARY_KEY}, (), id="resolve_quiz_owners"),
+    pytest.param(lambda db, ids: ownership_operations.resolve_question_owners([ids["question_id"], ids["question_id"] + 1], db),
+                 {"questions": PRIMARY_KEY, "quizzes": PRIMARY_KEY}, (), id="resolve_question_owners"),
+    pytest.param(lambda db, ids: ownership_operations.resolve_answer_owners([ids["answer_id"], ids["answer_id"] + 1], db),
+                 {"answers": PRIMARY_KEY, "questions": PRIMARY_KEY, "quizzes": PRIMARY_KEY}, (),
+                 id="resolve_answer_owners"),
+    pytest.param(lambda db, ids: taken_quiz_operations.get_taken_quizzes(ids["user_id"], db),
+                 {"takenQuizzes": "ix_takenQuizzes_user_id_id"}, (), id="get_taken_quizzes"),
+    pytest.param(lambda db, ids: taken_quiz_operations.get_answer_key(ids["quiz_id"], db),
+                 {"quizzes": PRIMARY_KEY, "questions": "ix_questions_quiz_id_id", "answers": "ix_answers_question_id_id"},
+                 (), id="get_answer_key"),
+    pytest.param(lambda db, ids: user_operations.get_user_by_username("user3", db),
+                 {"users": UNIQUE}, (), id="get_user_by_username"),
+    pytest.param(lambda db, ids: user_operations.get_user_by_id(ids["user_id"], db),
+                 {"users": PRIMARY_KEY}, (), id="get_user_by_id"),
+    pytest.param(lambda db, ids: user_operations.get_all_users(1, 10, db),
+                 {}, ("users",), id="get_all_users"),
+    pytest.param(lambda db, ids: load_suggestions(db),
+                 {"quizzes": APPROVED, "categories": "ix_categories_approved_id"}, (),
+                 id="load_suggestions"),
+    pytest.param(lambda db, ids: drain(export_operations.stream_quiz_documents(ids["user_id"], db)),
+                 {"quizzes": "ix_quizzes_user_id_approved_id", "questions": "ix_questions_quiz_id_id",
+                  "answers": "ix_answers_question_id_id"}, (), id="export user quizzes"),
+    pytest.param(lambda db, ids: drain(export_operations.stream_taken_quizzes(ids["user_id"], db)),
+                 {"takenQuizzes": "ix_takenQuizzes_user_id_id"}, (), id="export user taken quizzes"),
+    pytest.param(lambda db, ids: quiz_operations.rate_quiz(ids["quiz_id"], 4, db),
+                 {"quizzes": PRIMARY_KEY}, (), id="rate_quiz"),
+    pytest.param(lambda db, ids: quiz_operations.approve_quiz(ids["quiz_id"], True, db),
+                 {"quizzes": PRIMARY_KEY}, (), id="approve_quiz"),
+    pytest.param(lambda db, ids: quiz_operations.update_quiz(
+                     ids["quiz_id"], QuizRequest(category_id=ids["category_id"], title="Renamed", description="Renamed quiz"), db),
+                 {"quizzes": PRIMARY_KEY}, (), id="update_quiz"),
+    pytest.param(lambda db, ids: answer_operations.update_answer(
+                     ids["answer_id"], ids["quiz_id"],
+                     AnswerRequest(question_id=ids["question_id"], text="Renamed", isCorrect=True), db),
+                 {"answers": PRIMARY_KEY, "quizzes": PRIMARY_KEY}, (), id="update_answer"),
+    pytest.param(lambda db, ids: category_operations.update_category(
+                     ids["category_id"], CategoryRequest(name="Renamed category", description="Renamed category"), db),
+                 {"categories": PRIMARY_KEY, "quizzes": "ix_quizzes_category_id_id"}, (), id="update_category"),
+    pytest.param(lambda db, ids: user_operations.update_user_profile(ids["user_id"], UserUpdateRequest(display_name="Renamed"), db),
+                 {"users": PRIMARY_KEY, "quizzes": "ix_quizzes_user_id_approved_id"}, (), id="update_user_profile"),
+]
+
+
+# Other plans PostgreSQL picks for 2000 quizzes, where costs rather than a missing index decide. Most quizzes are
+# approved, so walking the primary key in id order and filtering beats the approved indexes, and approved searches
+# filter the approved rows instead of reading the GIN index; the unfiltered searches still have to use it. One user's
+# quizzes cover a twentieth of the questions, cheap enough to hash-join in full.
+POSTGRES_ALTERNATIVES = {
+    "get_all_approved_quizzes": {"quizzes": (PRIMARY_KEY,)},
+    "get_all_approved_quizzes cursor": {"quizzes": (PRIMARY_KEY,)},
+    "get_unapproved_quizzes": {"quizzes": (PRIMARY_KEY,)},
+    "search_approved_quizzes": {"quizzes": APPROVED},
+    "search_approved_categories": {"categories": ("ix_categories_approved_id",)},
+    "export user quizzes": {"questions": (PRIMARY_KEY,)},
+}
+
+
+def _sqlite_access(detail: str) -> tuple[str, str | None] | None:
+    match = re.fullmatch(r"(?:SEARCH|SCAN) (\w+)(?: AS \w+)?( USING INTEGER PRIMARY KEY| USING (?:COVERING )?INDEX (\w+)"
+                         r"| VIRTUAL TABLE INDEX .*)?(?: \(.*\))?(?: LEFT-JOIN)?", detail)
+    if match is None:
+        return None
+    # Joined tables show up under their alias, e.g. users_1.
+    table, using, index = re.sub(r"_\d+$", "", match.group(1)), match.group(2), match.group(3)
+    if table.endswith("_fts"):
+        return table.removesuffix("_fts"), FULL_TEXT
+    if using is None:
+        return table, None
+    if index is None:
+        return table, PRIMARY_KEY
+    return table, UNIQUE if index.startswith("sqlite_autoindex_") else index
+
+
+def _postgres_index(table: str, index: str) -> str:
+    # The id columns also carry a plain index (index=True), which PostgreSQL tends to pick over the primary key's.
+    if index in (f"{table}_pkey", f"ix_{table}_id"):
+        return PRIMARY_KEY
+    if index == f"ix_{table}_search_vector":
+        return FULL_TEXT
+    return UNIQUE if index.endswith("_key") else index
+
+
+def _postgres_accesses(plan: dict, table: str | None = None) -> list[tuple[str, str | None]]:
+    # Bitmap index scans name their index but not the table; the heap scan above them does.
+    table = plan.get("Relation Name", table)
+    accesses = []
+    if plan.get("Node Type") == "Seq Scan":
+        accesses.append((table, None))
+    elif "Index Name" in plan:
+        accesses.append((table, _postgres_index(table, plan["Index Name"])))
+    for child in plan.get("Plans", []):
+        accesses += _postgres_accesses(child, table)
+    return accesses
+
+
+# Every table a statement reads, with the index it goes through; None is a sequential scan.
+async def accesses(statement: str, parameters) -> list[tuple[str, str | None]]:
+    async with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            # With sequential scans priced out, one only shows up when no index can serve the query at all.
+            await conn.exec_driver_sql("SET enable_seqscan = off")
+            plan = (await conn.exec_driver_sql("EXPLAIN (FORMAT JSON) " + statement, parameters)).scalar_one()
+            return _postgres_accesses((json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"])
+        rows = (await conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)).all()
+        return [access for row in rows if (access := _sqlite_access(row[-1])) is not None]
+
+
+@pytest.fixture(scope="module")
+def seeded(run):
+    return run(seed(random.Random(42)))
+
+
+@pytest.fixture
+def captured():
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and re.match(r"\s*(SELECT|WITH|UPDATE|DELETE)\b", statement, re.I):
+            statements.append((statement, parameters))
+
+    event.listen(engine.sync_engine, "before_cursor_execute", capture)
+    yield statements
+    event.remove(engine.sync_engine, "before_cursor_execute", capture)
+
+
+@pytest.mark.parametrize("operation, indexes, allowed_scans", HOT_QUERIES)
+def test_hot_query_uses_its_index(operation, indexes, allowed_scans, seeded, captured, run, request):
+    async def check():
+        await operation(sessionLocal(), seeded)
+        statements = list(captured)
+        captured.clear()
+        used = [access for statement, parameters in statements for access in await accesses(statement, parameters)]
+        return statements, used
+
+    statements, used = run(check())
+    assert statements, "the operation ran no statements"
+    scans = {table for table, index in used if index is None and table not in allowed_scans}
+    assert not scans, f"sequential scan on {', '.join(sorted(scans))}: {used}"
+    alternatives = POSTGRES_ALTERNATIVES.get(request.node.callspec.id, {}) if engine.dialect.name == "postgresql" else {}
+    for table, expected in indexes.items():
+        expected = (expected if isinstance(expected, tuple) else (expected,)) + alternatives.get(table, ())
+        assert any((table, index) in used for index in expected), f"{table} not read through {' or '.join(expected)}: {used}"
@@ -0,0 +1,162 @@
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.lru_cache import LRUCache
+from utils.metrics import Counter, Gauge
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSIONMINSIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIPLEVEL", "6"))
+# Brotli's top qualities are far too slow for per-request compression; 4-5 already beats gzip -6 on JSON.
+BROTLI_LEVEL = int(os.getenv("BROTLILEVEL", "4"))
+COMPRESSION_CACHE_BYTES = int(os.getenv("COMPRESSIONCACHEBYTES", str(32 * 1024 * 1024)))
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+compressed_bodies = LRUCache(COMPRESSION_CACHE_BYTES)
+
+Counter("compression_cache_hits_total", "Responses served from the pre-compressed body cache.", lambda: compressed_bodies.hits)
+Counter("compression_cache_misses_total", "Cacheable responses that had to be compressed.", lambda: compressed_bodies.misses)
+Gauge("compression_cache_bytes", "Compressed bodies currently cached, in bytes.", lambda: compressed_bodies.weight)
+compressed_responses = Counter("compression_responses_total", "Responses sent compressed, by encoding.")
+
+
+def _encodings() -> tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+# Picks the server-preferred encoding among those the client accepts with a non-zero q-value.
+def negotiate(accept_encoding: str) -> str | None:
+    accepted = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip()] = quality
+    for encoding in _encodings():
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class _Compressor:
+    def __init__(self, encoding: str, gzip_level: int, brotli_level: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_level)
+        else:
+            self._brotli = None
+            # wbits 31 writes a gzip header with a zero mtime, so equal bodies compress to equal bytes.
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush()
+
+
+# Negotiated gzip/brotli for JSON and text responses. A response that arrives in one piece is compressed only above
+# the size threshold; streamed responses (exports) are compressed chunk by chunk. Responses carrying an ETag name one
+# exact body, so their compressed form is cached by (path, ETag, encoding) and a popular quiz is compressed once per
+# revision rather than on every hit. The ETag is weakened on compressed responses, as the bytes differ per encoding;
+# If-None-Match already compares weakly.
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = COMPRESSION_MIN_SIZE, gzip_level: int = GZIP_LEVEL,
+                 brotli_level: int = BROTLI_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_level = brotli_level
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["method"] == "HEAD":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Message | None = None
+        compressor: _Compressor | None = None
+        passthrough = False
+
+        async def send_compressed(message: Message):
+            nonlocal start, compressor, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if compressor is not None:
+                data = compressor.compress(body) if more_body else compressor.finish(body)
+                await send({"type": "http.response.body", "body": data, "more_body": more_body})
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            if not self._compressible(start["status"], headers) or (not more_body and len(body) < self.minimum_size):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            headers["Content-Encoding"] = encoding
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag is not None and not etag.startswith("W/"):
+                headers["ETag"] = "W/" + etag
+            compressed_responses.inc(encoding=encoding)
+
+            if not more_body:
+                data = self._compress_whole(scope["path"], etag, encoding, body)
+                headers["Content-Length"] = str(len(data))
+                await send(start)
+                await send({"type": "http.response.body", "body": data})
+                return
+
+            del headers["Content-Length"]
+            compressor = _Compressor(encoding, self.gzip_level, self.brotli_level)
+            await send(start)
+            await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+
+        await self.app(scope, receive, send_compressed)
+
+    @staticmethod
+    def _compressible(status: int, headers: MutableHeaders) -> bool:
+        if status < 200 or status in (204, 304) or "content-encoding" in headers:
+            return False
+        return headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+
+    def _compress_whole(self, path: str, etag: str | None, encoding: str, body: bytes) -> bytes:
+        if etag is None:
+            return _Compressor(encoding, self.gzip_level, self.brotli_level).finish(body)
+        key = (path, etag, encoding)
+        data = compressed_bodies.get(key)
+        if data is None:
+            data = _Compressor(encoding, self.gzip_level, self.brotli_level).finish(body)
+            compressed_bodies.set(key, data, weight=len(data))
+        return data
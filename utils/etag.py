@@ -0,0 +1,37 @@
+import hashlib
+import os
+
+from fastapi import Request, Response
+
+# Responses depend on the caller's token, so shared caches must not keep them and clients revalidate every time.
+CACHE_CONTROL = os.getenv("CACHECONTROL", "private, no-cache")
+
+
+def etag(*parts) -> str:
+    return '"' + "-".join(str(part) for part in parts) + '"'
+
+
+def body_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+# If-None-Match compares weakly, so W/ prefixes are ignored on both sides.
+def matches(request: Request, tag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tag = tag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == tag for candidate in header.split(","))
+
+
+def cache_headers(response: Response, tag: str):
+    response.headers["ETag"] = tag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+
+
+def not_modified(tag: str) -> Response:
+    response = Response(status_code=304)
+    cache_headers(response, tag)
+    return response
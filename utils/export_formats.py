@@ -0,0 +1,33 @@
+import csv
+import io
+import json
+from typing import AsyncIterable, AsyncIterator, Iterable
+
+# Rows are buffered into chunks of roughly this many bytes before being handed to the response.
+CHUNK_SIZE = 64 * 1024
+
+
+async def ndjson_chunks(items: AsyncIterable[dict]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    async for item in items:
+        buffer.write(json.dumps(item, separators=(",", ":"), default=str))
+        buffer.write("\n")
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer = io.StringIO()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def csv_chunks(header: Iterable[str], rows: AsyncIterable[Iterable]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    async for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode()
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+    if buffer.tell():
+        yield buffer.getvalue().encode()
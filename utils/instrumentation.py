@@ -0,0 +1,147 @@
+import asyncio
+import logging
+import os
+import reprlib
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from utils.metrics import Counter, Gauge, Histogram
+
+LOOP_LAG_INTERVAL = float(os.getenv("LOOPLAGINTERVAL", "0.5"))
+# Statements at least this slow are logged with their bound parameters; 0 turns the log off.
+SLOW_QUERY_SECONDS = float(os.getenv("SLOWQUERYSECONDS", "0.1"))
+
+logger = logging.getLogger(__name__)
+
+_request_duration = Histogram("http_request_duration_seconds", "Time to handle a request, streamed bodies included.")
+_request_statements = Histogram("http_request_sql_statements", "SQL statements executed per request.",
+                                buckets=(0, 1, 2, 3, 4, 5, 8, 13, 21, 34, 55, 100))
+_request_db_time = Histogram("http_request_db_seconds", "Time spent executing SQL statements per request.",
+                             buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5))
+_request_rows = Counter("http_request_rows_fetched_total", "Rows returned by the SQL statements of requests.")
+_statements = Counter("db_statements_total", "SQL statements executed, inside requests or not.")
+_statement_time = Counter("db_statement_seconds_total", "Time spent executing SQL statements, inside requests or not.")
+_slow_statements = Counter("db_slow_statements_total", "SQL statements that took at least SLOWQUERYSECONDS.")
+_connections_opened = Counter("db_pool_connections_opened_total", "Physical connections opened by the pools.")
+_checkouts = Counter("db_pool_checkouts_total", "Connections handed out by the pools.")
+_loop_lag = Histogram("event_loop_lag_seconds", "How late the event loop woke a sleeping task.",
+                      buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1, 2.5))
+_last_loop_lag = [0.0]
+Gauge("event_loop_lag_last_seconds", "Event loop lag measured by the latest probe.", lambda: _last_loop_lag[0])
+
+
+class RequestStats:
+    __slots__ = ("statements", "db_time", "rows", "executed")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.rows = 0
+        # SQL text -> executions; only kept when something (the query budget check) asks for it.
+        self.executed: dict[str, int] | None = None
+
+
+request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+# The start time rides on the statement's execution context, so a statement that fails leaves nothing behind.
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    context.statement_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - context.statement_started
+    _statements.inc()
+    _statement_time.inc(elapsed)
+    if SLOW_QUERY_SECONDS and elapsed >= SLOW_QUERY_SECONDS:
+        _slow_statements.inc()
+        logger.warning("Slow query took %.3fs: %s; parameters: %s", elapsed, " ".join(statement.split()),
+                       reprlib.repr(parameters))
+    stats = request_stats.get()
+    if stats is None:
+        return
+    stats.statements += 1
+    stats.db_time += elapsed
+    if stats.executed is not None:
+        stats.executed[statement] = stats.executed.get(statement, 0) + 1
+    # The async adapters buffer a whole result at execute time; streamed (server side) results are fetched later
+    # in batches and are not counted.
+    if cursor.description is not None and not getattr(context, "_is_server_side", False):
+        stats.rows += len(getattr(cursor, "_rows", ()))
+
+
+def instrument_engine(engine: AsyncEngine):
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine.pool, "connect", lambda *_: _connections_opened.inc())
+    event.listen(engine.sync_engine.pool, "checkout", lambda *_: _checkouts.inc())
+
+
+# Records latency, SQL statements, DB time and rows per route template. Requests no route matched share one
+# label so that scanners can't grow the label set.
+class RequestMetricsMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = request_stats.set(stats)
+        status = 500
+        started = time.perf_counter()
+
+        async def send_with_status(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_stats.reset(token)
+            route = scope.get("route")
+            labels = {"method": scope["method"], "route": route.path if route is not None else "unmatched"}
+            _request_duration.observe(elapsed, status=str(status), **labels)
+            _request_statements.observe(stats.statements, **labels)
+            _request_db_time.observe(stats.db_time, **labels)
+            _request_rows.inc(stats.rows, **labels)
+
+
+class LoopLagMonitor:
+    # Sleeps for a fixed interval and records how much later than asked the loop resumed it; anything blocking
+    # the loop (CPU-bound work, a synchronous call) shows up as lag for every request in flight.
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    async def _run(self):
+        while True:
+            started = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(time.perf_counter() - started - self.interval, 0.0)
+            _last_loop_lag[0] = lag
+            _loop_lag.observe(lag)
+
+    def start(self):
+        if self.interval > 0 and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+loop_lag_monitor = LoopLagMonitor(LOOP_LAG_INTERVAL)
@@ -0,0 +1,33 @@
+from functools import cache
+from typing import Any
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+
+from models.responses.page_response import Page, CursorPage
+from utils.etag import body_etag, matches, cache_headers, not_modified
+
+
+@cache
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+# Reads ORM objects straight from their attributes and writes the JSON in pydantic-core, skipping jsonable_encoder and
+# the intermediate dicts FastAPI builds when it serializes a response_model itself. Routes still declare response_model
+# so the schema shows up in the docs. Listings have no single version to compare, so their ETag hashes the body: a
+# match still runs the query but saves sending the payload again.
+def json_response(request: Request, model: Any, content: Any) -> Response:
+    adapter = _adapter(model)
+    body = adapter.dump_json(adapter.validate_python(content, from_attributes=True))
+    tag = body_etag(body)
+    if matches(request, tag):
+        return not_modified(tag)
+    response = Response(body, media_type="application/json")
+    cache_headers(response, tag)
+    return response
+
+
+# Offset pages carry totals, keyset pages only the next cursor.
+def page_response(request: Request, item: type, page: dict) -> Response:
+    return json_response(request, Page[item] if "total" in page else CursorPage[item], page)
@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+_MISSING = object()
+
+
+class LRUCache:
+    # maxsize bounds the summed entry weights; with the default weight of 1 that is the entry count.
+    def __init__(self, maxsize: int, ttl: float | None = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.weight = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any, int]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        entry = self._data.get(key, _MISSING)
+        if entry is _MISSING:
+            self.misses += 1
+            return default
+        expires, value, _ = entry
+        if expires and expires < time.monotonic():
+            self._discard(key)
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, weight: int = 1):
+        self._discard(key)
+        expires = time.monotonic() + self.ttl if self.ttl else 0.0
+        self._data[key] = (expires, value, weight)
+        self.weight += weight
+        while self.weight > self.maxsize and self._data:
+            _, (_, _, evicted) = self._data.popitem(last=False)
+            self.weight -= evicted
+
+    def _discard(self, key: Hashable) -> Any:
+        entry = self._data.pop(key, _MISSING)
+        if entry is _MISSING:
+            return _MISSING
+        self.weight -= entry[2]
+        return entry[1]
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        value = self._discard(key)
+        return default if value is _MISSING else value
+
+    def pop_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        keys = [key for key, (_, value, _) in self._data.items() if predicate(key, value)]
+        for key in keys:
+            self._discard(key)
+        return len(keys)
+
+    def clear(self):
+        self._data.clear()
+        self.weight = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "weight": self.weight,
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
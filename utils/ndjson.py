@@ -0,0 +1,16 @@
+from typing import AsyncIterable, AsyncIterator
+
+
+# Splits a byte stream into (line number, line) pairs without buffering more than one partial line; blank lines are skipped.
+async def read_ndjson_lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[tuple[int, bytes]]:
+    buffer = b""
+    number = 0
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            number += 1
+            if line.strip():
+                yield number, line
+    if buffer.strip():
+        yield number + 1, buffer
@@ -0,0 +1,188 @@
+import logging
+import os
+import re
+from contextlib import contextmanager
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from utils.instrumentation import RequestStats, request_stats
+from utils.metrics import Counter
+
+# off: nothing is recorded; warn: violations are logged and counted. Tests collect them with enforce_query_budgets().
+QUERY_BUDGET_MODE = os.getenv("QUERYBUDGETMODE", "warn")
+# Statements allowed for a route missing from QUERY_BUDGETS.
+QUERY_BUDGET_DEFAULT = int(os.getenv("QUERYBUDGETDEFAULT", "8"))
+# The same statement shape executed this many times in one request looks like a loop issuing one query per item.
+QUERY_REPEAT_LIMIT = int(os.getenv("QUERYREPEATLIMIT", "3"))
+
+logger = logging.getLogger(__name__)
+
+_violations = Counter("query_budget_violations_total", "Requests over their statement budget or repeating a statement.")
+
+budget_mode = [QUERY_BUDGET_MODE]
+# Where enforce_query_budgets() collects violations; None logs them.
+_recorded: list[list[str] | None] = [None]
+
+# Statements each route issues with the user and quiz caches cold, as tests/test_query_budgets.py measures them on
+# SQLite and Postgres. None leaves a route unbounded: SQLite runs INSERT ... RETURNING with sort_by_parameter_order row
+# by row, so the imports issue one statement per question there.
+QUERY_BUDGETS: dict[str, int | None] = {
+    "POST /register": 3,
+    "POST /token": 1,
+    "GET /user": 1,
+    "GET /user/users": 2,
+    "GET /user/users/{user_id}": 2,
+    "PUT /user": 3,
+    "PUT /user/change_password": 2,
+    "PUT /user/promote/{id}": 3,
+    "PUT /user/demote/{id}": 3,
+    "DELETE /user": 3,
+    "GET /category": 2,
+    "GET /category/search": 2,
+    "GET /category/unapproved": 2,
+    "GET /category/{id}": 2,
+    "POST /category": 3,
+    "PUT /category/approve/{id}": 3,
+    "PUT /category/{id}": 5,
+    "DELETE /category/{id}": 3,
+    "GET /quiz": 2,
+    "GET /quiz/user": 2,
+    "GET /quiz/search": 2,
+    "GET /quiz/unapproved": 2,
+    "GET /quiz/filter": 3,
+    "GET /quiz/user/{user_id}": 3,
+    "GET /quiz/{id}": 3,
+    "POST /quiz": 3,
+    "POST /quiz/import": None,
+    "POST /quiz/import/ndjson": None,
+    "PUT /quiz/rate/{id}": 2,
+    "PUT /quiz/approve/{id}": 3,
+    "PUT /quiz/{id}": 4,
+    "DELETE /quiz/{id}": 3,
+    "POST /question": 4,
+    "PUT /question/{id}": 4,
+    "DELETE /question/bulk": 4,
+    "DELETE /question/{id}": 4,
+    "POST /answer": 4,
+    "POST /answer/bulk": 4,
+    "PUT /answer/{id}": 4,
+    "DELETE /answer/bulk": 4,
+    "DELETE /answer/{id}": 4,
+    "GET /taken_quiz": 2,
+    "GET /taken_quiz/user/{id}": 3,
+    "POST /taken_quiz/submit": 3,
+    "GET /search/suggest": 1,
+    "GET /export/quizzes": 2,
+    "GET /export/taken_quizzes": 2,
+    "GET /metrics": 0,
+}
+
+# Routes that repeat a statement by design, e.g. one INSERT per batch of a streamed import.
+REPEAT_ALLOWED = {
+    "POST /quiz/import",
+    "POST /quiz/import/ndjson",
+}
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+_PLACEHOLDER = re.compile(r"\$\d+|%\(\w+\)s|%s|:\w+|\?")
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_REPEATED_GROUP = re.compile(r"\((\?(?:, \?)*)\)(?:, \(\1\))+")
+_REPEATED_PLACEHOLDER = re.compile(r"\?(?:, \?)+")
+
+
+# One shape per statement whatever its values: placeholders and literals become ?, expanded IN lists and multi-row
+# VALUES collapse to a single entry.
+def normalize(statement: str) -> str:
+    shape = _LITERAL.sub("?", _PLACEHOLDER.sub("?", " ".join(statement.split())))
+    return _REPEATED_PLACEHOLDER.sub("?", _REPEATED_GROUP.sub(r"(\1)", shape))
+
+
+def find_violations(stats: RequestStats, budget: int | None, repeat_limit: int | None) -> list[str]:
+    problems = []
+    if budget is not None and stats.statements > budget:
+        problems.append(f"{stats.statements} statements, budget {budget}")
+    if repeat_limit is not None and stats.executed:
+        shapes: dict[str, int] = {}
+        for statement, count in stats.executed.items():
+            shape = normalize(statement)
+            shapes[shape] = shapes.get(shape, 0) + count
+        for shape, count in shapes.items():
+            if count >= repeat_limit:
+                problems.append(f"{count} executions of {shape}")
+    return problems
+
+
+def _report(label: str, problems: list[str]):
+    if not problems:
+        return
+    _violations.inc(route=label)
+    message = f"{label}: " + "; ".join(problems)
+    if _recorded[0] is not None:
+        _recorded[0].append(message)
+    else:
+        logger.warning("Query budget exceeded by %s", message)
+
+
+# Checks each request against its route's statement budget and for repeated statement shapes. Sits inside
+# RequestMetricsMiddleware and shares its per-request stats.
+class QueryBudgetMiddleware:
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        mode = budget_mode[0]
+        if scope["type"] != "http" or mode == "off":
+            await self.app(scope, receive, send)
+            return
+        stats = request_stats.get()
+        token = None
+        if stats is None:
+            stats = RequestStats()
+            token = request_stats.set(stats)
+        stats.executed = {}
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            if token is not None:
+                request_stats.reset(token)
+        route = scope.get("route")
+        if route is None:
+            return
+        label = f"{scope['method']} {route.path}"
+        repeat_limit = None if label in REPEAT_ALLOWED else QUERY_REPEAT_LIMIT
+        _report(label, find_violations(stats, QUERY_BUDGETS.get(label, QUERY_BUDGET_DEFAULT), repeat_limit))
+
+
+# A request is only checked once its response has gone out, so a violation can't fail the request itself. Inside this
+# block requests are checked whatever QUERYBUDGETMODE says and their violations are collected in the yielded list for
+# the caller to raise, as the tests' client does after every request.
+@contextmanager
+def enforce_query_budgets():
+    recorded: list[str] = []
+    previous = budget_mode[0], _recorded[0]
+    budget_mode[0], _recorded[0] = "warn", recorded
+    try:
+        yield recorded
+    finally:
+        budget_mode[0], _recorded[0] = previous
+
+
+# The same checks for a block of code outside a request, e.g. an operation called directly; this one raises as the
+# block ends.
+@contextmanager
+def query_budget(budget: int, repeat_limit: int | None = QUERY_REPEAT_LIMIT, label: str = "block"):
+    stats = RequestStats()
+    stats.executed = {}
+    token = request_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        request_stats.reset(token)
+    problems = find_violations(stats, budget, repeat_limit)
+    if problems:
+        _violations.inc(route=label)
+        raise QueryBudgetExceeded(f"{label}: " + "; ".join(problems))